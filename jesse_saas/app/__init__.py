@@ -1,59 +1,46 @@
+import time
+_import_started = time.perf_counter()
+
 from flask import Flask
-from .extensions import db, migrate, cors
+from .extensions import db, cors
 from config import Config
 
+# Time spent importing Flask, extensions and config (first phase of a cold start)
+_import_seconds = time.perf_counter() - _import_started
+
 def create_app(config_class=Config):
+    timings = {'import': _import_seconds}
+    started = time.perf_counter()
+    phase = started
+
+    def mark(name):
+        nonlocal phase
+        now = time.perf_counter()
+        timings[name] = now - phase
+        phase = now
+
     app = Flask(__name__)
     app.config.from_object(config_class)
+    mark('config')
 
     # Initialize Extensions
     db.init_app(app)
-    migrate.init_app(app, db)
     cors.init_app(app)
 
     # Register Models (Importing them ensures they are known to SQLAlchemy/Migrate)
     from . import models
+    mark('extensions')
 
-    # Auto-create tables & Fix Schema for Vercel
+    # Schema Check: one version lookup instead of create_all + introspection
+    # when the recorded version matches (see app/schema.py, `flask schema sync`)
+    from .schema import check_schema
     with app.app_context():
-        db.create_all()
-        
-        # ---------------------------------------------------------
-        # HOTFIX: Auto-Migrate columns if missing
-        # ---------------------------------------------------------
         try:
-            from sqlalchemy import text, inspect
-            inspector = inspect(db.engine)
-            if 'menu_items' in inspector.get_table_names():
-                cols = [c['name'] for c in inspector.get_columns('menu_items')]
-                
-                # Migrate allergy_info
-                if 'allergy_info' not in cols:
-                    print("⚠️ Migration: Adding missing 'allergy_info' column...")
-                    with db.engine.connect() as conn:
-                        conn.execute(text("ALTER TABLE menu_items ADD COLUMN allergy_info VARCHAR(255)"))
-                        conn.commit()
-                    print("✅ Migration: 'allergy_info' added.")
-
-                # Migrate original_price
-                if 'original_price' not in cols:
-                    print("⚠️ Migration: Adding missing 'original_price' column...")
-                    with db.engine.connect() as conn:
-                        conn.execute(text("ALTER TABLE menu_items ADD COLUMN original_price FLOAT"))
-                        conn.commit()
-                    print("✅ Migration: 'original_price' added.")
-
-                # Migrate labels
-                if 'labels' not in cols:
-                    print("⚠️ Migration: Adding missing 'labels' column...")
-                    with db.engine.connect() as conn:
-                        conn.execute(text("ALTER TABLE menu_items ADD COLUMN labels VARCHAR(255)"))
-                        conn.commit()
-                    print("✅ Migration: 'labels' added.")
-                    
+            schema_state = check_schema(app.config['SCHEMA_STARTUP_CHECK'])
         except Exception as e:
+            schema_state = 'failed'
             print(f"❌ Migration Error: {e}")
-        # ---------------------------------------------------------
+    mark('schema')
 
     # Register Blueprints
     from .api.routes import bp as api_bp
@@ -63,9 +50,26 @@ def create_app(config_class=Config):
 
     app.register_blueprint(admin_bp)
 
+    # Write-behind interaction logging
+    from .services.log_ingest import LogIngestService
+    LogIngestService.init_app(app)
+
+    # Background pushes of admin uploads to the storage backend
+    from .services.upload_pipeline import UploadPipeline
+    UploadPipeline.init_app(app)
+
+    # Admin edits drop stale prerendered pages (flask prerender build)
+    from .services.prerender_service import PrerenderService
+    PrerenderService.init_app(app)
+
+    # CLI Commands (flask db ..., flask analytics ..., flask schema ..., flask prerender ..., flask uploads ...)
+    from .cli import register_commands
+    register_commands(app)
+    mark('blueprints')
+
     @app.route('/db-debug')
     def db_debug():
-        from flask import jsonify, request
+        from flask import jsonify, request, current_app
         from sqlalchemy import inspect, text
         
         status = {}
@@ -79,6 +83,7 @@ def create_app(config_class=Config):
             inspector = inspect(db.engine)
             tables = inspector.get_table_names()
             status['tables'] = tables
+            status['startup'] = current_app.extensions.get('startup')
             
             # 3. Force Init (Optional)
             if request.args.get('init') == 'true':
@@ -100,15 +105,18 @@ def create_app(config_class=Config):
     def utility_processor():
         def resolve_file(filename, folder='', width=None):
             return UploadService.resolve_url(filename, width=width)
-        return dict(resolve_file=resolve_file)
+        def resolve_srcset(filename, fmt=None):
+            return UploadService.resolve_srcset(filename, fmt=fmt)
+        return dict(resolve_file=resolve_file, resolve_srcset=resolve_srcset)
 
     @app.route('/uploads/<path:filename>')
     def uploaded_file(filename):
-        from flask import send_from_directory, current_app
+        from flask import current_app
+        from .services.upload_service import UploadService
         # This route is for LOCAL dev only or Vercel /tmp fallback
         # In cloud mode, resolve_file should return the remote URL directly, never hitting this.
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        return send_from_directory(upload_folder, filename)
+        # With UPLOAD_SERVE_MODE x-accel/sendfile the web server streams the file, not this worker.
+        return UploadService.serve(current_app.config['UPLOAD_FOLDER'], filename)
 
     @app.route('/favicon.png')
     @app.route('/favicon.ico')
@@ -142,20 +150,30 @@ def create_app(config_class=Config):
     # Standalone Chat Page (SSR Simulator)
     @app.route('/chat/<public_id>')
     def standalone_chat(public_id):
-        from flask import render_template, abort
-        import json
-        from .models import Client, MenuItem
+        from flask import request
+        from .services.tenant_cache import TenantCache
+        from .services.page_cache import PageCache
 
-        # Find client by public_id (or slug if implemented, but public_id is safer initially)
-        # Assuming public_id is the UUID or slug.
-        client = Client.query.filter_by(public_id=public_id).first()
-        if not client:
-             # Fallback to slug lookup if not found
-             client = Client.query.filter_by(slug=public_id).first()
+        # Find client by public_id, falling back to slug (cached read-only snapshot)
+        client = TenantCache.resolve(public_id)
 
         if not client:
             return "Client not found", 404
 
+        # Display Mode: 'embed' or 'standalone' (default); normalised so it cannot grow the cache
+        mode = 'embed' if request.args.get('mode') == 'embed' else 'standalone'
+
+        # Cached shell per tenant content version; menu items load from /api/menu/<public_id>
+        page = PageCache.get_or_render(
+            (client.id, client.content_version, 'chat', mode),
+            lambda: _render_chat_shell(client, mode)
+        )
+        return PageCache.respond(page)
+
+    def _render_chat_shell(client, mode):
+        from flask import render_template, url_for
+        import json
+
         kb = client.knowledge_base
         
         # Parse Starters JSON safely
@@ -168,14 +186,6 @@ def create_app(config_class=Config):
 
         # Theme Defaults
         theme_color = client.theme_color or '#2563EB'
-        
-        # Display Mode: 'embed' or 'standalone' (default)
-        from flask import request
-        mode = request.args.get('mode', 'standalone')
-
-        # Fetch Menu Data
-        menu_items = MenuItem.query.filter_by(client_id=client.id, is_available=True).all()
-        menu_data = [item.to_dict() for item in menu_items]
 
         return render_template(
             'chat/index.html',
@@ -184,7 +194,7 @@ def create_app(config_class=Config):
             starters=starters,
             theme_color=theme_color,
             mode=mode,
-            menu_data=menu_data,
+            menu_data_url=url_for('api.get_menu_data', public_id=client.public_id, v=client.content_version),
             currency=client.currency_symbol,
             menu_config=kb.flow_menu if kb and kb.flow_menu else None
         )
@@ -195,16 +205,24 @@ def create_app(config_class=Config):
     # Public Menu Page (Webview Target)
     @app.route('/menu/<public_id>')
     def public_menu(public_id):
-        from flask import render_template
-        from .models import Client, MenuItem
+        from .services.tenant_cache import TenantCache
+        from .services.page_cache import PageCache
 
-        client = Client.query.filter_by(public_id=public_id).first()
-        if not client:
-             client = Client.query.filter_by(slug=public_id).first()
-        
+        client = TenantCache.resolve(public_id)
         if not client:
             return "Client not found", 404
 
+        # Rendered once per tenant content version; repeat scans get the cached HTML or a 304
+        page = PageCache.get_or_render(
+            (client.id, client.content_version, 'menu'),
+            lambda: _render_public_menu(client)
+        )
+        return PageCache.respond(page)
+
+    def _render_public_menu(client):
+        from flask import render_template
+        from .models import MenuItem
+
         menu_items = MenuItem.query.filter_by(client_id=client.id, is_available=True).all()
         # Group by Category for better display
         menu_by_cat = {}
@@ -239,4 +257,12 @@ def create_app(config_class=Config):
             theme_color=client.theme_color or '#2563EB'
         )
 
+    mark('routes')
+
+    timings['total'] = time.perf_counter() - started + _import_seconds
+    app.extensions['startup'] = {'schema': schema_state, 'timings': timings}
+    if app.config['STARTUP_TIMING_REPORT']:
+        report = " | ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in timings.items())
+        print(f"⏱️ Startup ({schema_state} schema): {report}")
+
     return app
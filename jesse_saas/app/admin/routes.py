@@ -5,13 +5,14 @@ from app.services.analytics import AnalyticsService
 from app.services.client_manager import ClientManager
 from app.services.upload_service import UploadService
 from app.services.menu_service import MenuService
+from app.services.cache_service import CacheService
 from config import Config
-import qrcode
 import io
 import os
 import json
 from datetime import datetime
 from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
 
 bp = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -27,6 +28,15 @@ def require_login():
     if request.endpoint not in allowed_routes and not is_logged_in():
         return redirect(url_for('admin.login'))
 
+@bp.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    # MAX_CONTENT_LENGTH exceeded: Werkzeug stops reading the body before buffering it
+    limit_mb = current_app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    if request.path.startswith('/admin/upload/'):
+        return jsonify({'error': f'Upload too large (max {limit_mb} MB)'}), 413
+    flash(f'Upload too large (max {limit_mb} MB per save).', 'error')
+    return redirect(request.referrer or url_for('admin.dashboard'))
+
 @bp.route('/login', methods=['GET', 'POST'])
 def login():
 
@@ -56,8 +66,8 @@ def logout():
 def dashboard():
     stats = AnalyticsService.get_dashboard_stats()
     
-    # Global Live Feed
-    recent_logs = InteractionLog.query.order_by(InteractionLog.timestamp.desc()).limit(15).all()
+    # Global Live Feed (always fresh; stats and top clients are briefly cached)
+    recent_logs = AnalyticsService.get_live_feed(limit=15)
     
     # Top Performing Assets (Clients by interaction volume) - Optimized
     top_clients = AnalyticsService.get_top_clients(limit=5)
@@ -70,27 +80,22 @@ def dashboard():
 
 @bp.route('/clients')
 def clients_list():
-    query = request.args.get('q', '').lower()
+    query = request.args.get('q', '')
     status_filter = request.args.get('status', 'all')
     plan_filter = request.args.get('plan', 'all')
+    after = request.args.get('after', type=int)
+    before = request.args.get('before', type=int)
     
-    clients_query = Client.query
-    
-    if status_filter != 'all':
-        clients_query = clients_query.filter_by(status=status_filter)
-    if plan_filter != 'all':
-        clients_query = clients_query.filter_by(plan_type=plan_filter)
-        
-    all_clients = clients_query.all()
-    
-    # Filter by search string
-    if query:
-        all_clients = [c for c in all_clients if query in c.restaurant_name.lower() or query in c.public_id.lower()]
+    clients, prev_cursor, next_cursor = ClientManager.search_clients(
+        query, status_filter, plan_filter,
+        after=after, before=before, limit=current_app.config['ADMIN_CLIENTS_PAGE_SIZE']
+    )
     
     stats = AnalyticsService.get_client_stats(status_filter, plan_filter)
     today = datetime.now().date()
     
-    return render_template('admin/clients.html', clients=all_clients, active_page='clients', stats=stats, today=today)
+    return render_template('admin/clients.html', clients=clients, active_page='clients', stats=stats, today=today,
+                           prev_cursor=prev_cursor, next_cursor=next_cursor)
 
 @bp.route('/logs')
 def system_logs():
@@ -265,6 +270,7 @@ def client_menu_reorder_categories(client_id):
         data = request.get_json()
         new_order = data.get('order', []) # Expect list of strings
         kb.category_order = json.dumps(new_order)
+        CacheService.bump_version(client)
         db.session.commit()
         return jsonify({'success': True})
     except Exception as e:
@@ -338,6 +344,7 @@ def client_publish(client_id):
     if request.method == 'POST':
         client.is_maintenance_mode = True if request.form.get('is_maintenance_mode') == 'true' else False
         client.allowed_domains = request.form.get('allowed_domains')
+        CacheService.bump_version(client)
         db.session.commit()
         flash('Publish settings updated.', 'success')
         return redirect(url_for('admin.client_publish', client_id=client.id))
@@ -349,7 +356,8 @@ def client_qr(client_id):
     client = Client.query.get_or_404(client_id)
     target_url = f"{request.host_url}chat/{client.public_id}"
     
-    # Use SVG factory to avoid Pillow dependency (saves ~50MB)
+    # Use SVG factory to avoid Pillow dependency (saves ~50MB); loaded on first QR only
+    import qrcode
     import qrcode.image.svg
     factory = qrcode.image.svg.SvgPathImage
     img = qrcode.make(target_url, image_factory=factory)
@@ -366,13 +374,27 @@ def client_stats(client_id, view_mode='overview'):
     client = Client.query.get_or_404(client_id)
     
     if view_mode == 'export_csv':
-        csv_data = AnalyticsService.get_export_csv(client.id)
-        
-        from flask import Response
+        try:
+            start_date = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if request.args.get('start') else None
+            end_date = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if request.args.get('end') else None
+        except ValueError:
+            flash('Invalid export date range.', 'error')
+            return redirect(url_for('admin.client_stats', client_id=client.id, view_mode='reports'))
+
+        # Streamed: rows are read in batches and never held in memory all at once
+        chunks = AnalyticsService.iter_export_csv(client.id, start_date, end_date)
+        filename = f"logs_{client.restaurant_name}_{datetime.utcnow().strftime('%Y%m%d')}.csv"
+        mimetype = "text/csv"
+        if request.args.get('gzip'):
+            chunks = AnalyticsService.gzip_chunks(chunks)
+            filename += ".gz"
+            mimetype = "application/gzip"
+
+        from flask import Response, stream_with_context
         return Response(
-            csv_data,
-            mimetype="text/csv",
-            headers={"Content-disposition": f"attachment; filename=logs_{client.restaurant_name}_{datetime.utcnow().strftime('%Y%m%d')}.csv"}
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={"Content-disposition": f"attachment; filename={filename}"}
         )
 
     if view_mode not in ['overview', 'conversations', 'events', 'trends', 'reports']:
@@ -387,13 +409,7 @@ def client_stats(client_id, view_mode='overview'):
         context['logs'] = client.logs.order_by(InteractionLog.timestamp.desc()).limit(50).all()
 
     elif view_mode == 'events':
-        # Still doing this inline for now as it wasn't strictly moved, but we can iterate.
-        # Ideally this should be in Service too, but sticking to plan scope.
-        context['events_breakdown'] = {
-            'Menu Clicks': client.logs.filter(InteractionLog.interaction_type == 'button_click', InteractionLog.user_query.ilike('%menu%')).count(),
-            'Location Clicks': client.logs.filter(InteractionLog.interaction_type == 'button_click', InteractionLog.user_query.ilike('%location%')).count(),
-            'Contact Clicks': client.logs.filter(InteractionLog.interaction_type == 'button_click', InteractionLog.user_query.ilike('%contact%')).count()
-        }
+        context['events_breakdown'] = AnalyticsService.get_events_breakdown(client.id)
         
     elif view_mode == 'trends':
         context['trend_data'] = AnalyticsService.get_trend_data(client.id)
@@ -435,6 +451,8 @@ def upload_bot_image():
                 # Local fallback logic
                 return jsonify({'url': url_for('uploaded_file', filename=url)})
             
+    except RequestEntityTooLarge:
+        raise # Answered by upload_too_large
     except Exception as e:
         print(f"UPLOAD ERROR: {str(e)}") # Log to Vercel/Console
         return jsonify({'error': f"Server Error: {str(e)}"}), 500
@@ -1,16 +1,32 @@
-from flask import Blueprint, request, jsonify
-from app.models import Client, KnowledgeBase, InteractionLog
-from app.extensions import db
+from flask import Blueprint, current_app, request, jsonify, Response, stream_with_context
 from app.services.upload_service import UploadService
+from app.services.tenant_cache import TenantCache
+from app.services.log_ingest import LogIngestService
+from app.services.event_classifier import EventClassifier
+from app.services.page_cache import PageCache
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 
 @bp.route('/config/<public_id>', methods=['GET'])
 def get_client_config(public_id):
-    client = Client.query.filter_by(public_id=public_id).first()
+    """
+    Widget configuration, fetched by widget.js on every host-page view.
+    Rendered once per tenant content version (and host, for the absolute image URLs)
+    and served with a strong ETag, so repeat views revalidate with a 304.
+    """
+    client = TenantCache.by_public_id(public_id)
     if not client:
         return jsonify({"error": "Client not found"}), 404
-    
+
+    import json
+    page = PageCache.get_or_render(
+        (client.id, client.content_version, 'config', request.host_url),
+        lambda: json.dumps(_client_config(client)),
+        mimetype='application/json'
+    )
+    return PageCache.respond(page)
+
+def _client_config(client):
     import json
     kb = client.knowledge_base
     starters = []
@@ -30,7 +46,8 @@ def get_client_config(public_id):
         # Legacy local logic (filename only)
         return request.host_url + f'static/uploads/{folder}/' + path
 
-    return jsonify({
+    return {
+        "version": client.content_version,
         "restaurant_name": client.restaurant_name,
         "theme_color": client.theme_color,
         "plan_type": client.plan_type,
@@ -38,7 +55,62 @@ def get_client_config(public_id):
         "avatar_url": resolve_url(kb.avatar_image, 'avatars') if kb else None,
         "welcome_image_url": resolve_url(kb.welcome_image_url, 'welcome') if kb else None,
         "conversation_starters": starters
-    }), 200
+    }
+
+# Placeholder in static/widget.js that the per-tenant variant replaces
+WIDGET_BOOT_PLACEHOLDER = "const INLINE_BOOT = null;"
+
+@bp.route('/widget/<public_id>.js', methods=['GET'])
+def get_widget_script(public_id):
+    """
+    widget.js with the tenant's config inlined: one request boots the widget.
+    Cached and revalidated like /api/config.
+    """
+    client = TenantCache.by_public_id(public_id)
+    if not client:
+        return Response("console.error('JESSE Widget: client not found');", status=404, mimetype='application/javascript')
+
+    def render():
+        import json
+        import os
+        with open(os.path.join(current_app.static_folder, 'widget.js'), encoding='utf-8') as f:
+            source = f.read()
+        boot = json.dumps({"public_id": client.public_id, "config": _client_config(client)}).replace('</', '<\\/')
+        return source.replace(WIDGET_BOOT_PLACEHOLDER, f"const INLINE_BOOT = {boot};", 1)
+
+    page = PageCache.get_or_render(
+        (client.id, client.content_version, 'widget_js', request.host_url),
+        render,
+        mimetype='application/javascript'
+    )
+    return PageCache.respond(page)
+
+@bp.route('/menu/<public_id>', methods=['GET'])
+def get_menu_data(public_id):
+    """
+    Available menu items as JSON for the chat page (loaded separately from the HTML shell).
+    The shell links it as ?v=<content_version>: a matching version is immutable and
+    cached for a year; anything else gets the current data with the short page max-age.
+    """
+    client = TenantCache.by_public_id(public_id)
+    if not client:
+        return jsonify({"error": "Client not found"}), 404
+
+    def render():
+        import json
+        from app.models import MenuItem
+        items = MenuItem.query.filter_by(client_id=client.id, is_available=True).all()
+        return json.dumps({
+            "version": client.content_version,
+            "items": [UploadService.resolve_item(item.to_dict()) for item in items] # URLs resolved once per version
+        })
+
+    page = PageCache.get_or_render((client.id, client.content_version, 'menu_json'), render, mimetype='application/json')
+    if request.args.get('v') == str(client.content_version):
+        response = PageCache.respond(page)
+        response.headers['Cache-Control'] = "public, max-age=31536000, immutable"
+        return response
+    return PageCache.respond(page)
 
 @bp.route('/chat', methods=['POST'])
 def chat():
@@ -50,8 +122,8 @@ def chat():
     if not public_id:
         return jsonify({"error": "Missing public_id"}), 400
 
-    # Step 1: Identification
-    client = Client.query.filter_by(public_id=public_id).first()
+    # Step 1: Identification (cached read-only snapshot)
+    client = TenantCache.by_public_id(public_id)
     if not client:
         return jsonify({"error": "Client not found"}), 404
 
@@ -71,11 +143,12 @@ def chat():
             # If no KB exists, handle gracefully
             return jsonify({"response": "No knowledge base configured."}), 200
 
-        msg_lower = (message_content or "").lower()
+        # Classified once: drives the reply and is stored for the events breakdown
+        event_key = EventClassifier.classify(message_content)
         
         reply = "I don't have that information."
         
-        if "menu" in msg_lower:
+        if event_key == 'menu':
             text = kb.flow_menu or "Here is our menu:"
             menu_url = kb.menu_url if kb.menu_url else None
             # If menu_url is stored but it's a file? Current logic: menu_url is a String URL usually.
@@ -84,32 +157,26 @@ def chat():
             
             reply = f"{text}\n\n[Open Menu]({menu_url})" if menu_url else (text if kb.flow_menu else "Menu not available.")
         
-        elif "wifi" in msg_lower:
+        elif event_key == 'wifi':
             reply = f"WiFi Password: {kb.wifi_password}" if kb.wifi_password else "No WiFi information."
         
-        elif "hours" in msg_lower:
+        elif event_key == 'hours':
             reply = kb.flow_hours or (f"Our hours are: {kb.opening_hours}" if kb.opening_hours else "Hours not specified.")
         
-        elif "location" in msg_lower:
+        elif event_key == 'location':
             reply = kb.flow_location or (f"We are located at: {kb.location_address}" if kb.location_address else "Address not specified.")
         
-        elif "about" in msg_lower:
+        elif event_key == 'about':
             reply = kb.flow_about or (kb.about_us if kb.about_us else "I don't have information about us yet.")
         
-        elif "reservation" in msg_lower or "contact" in msg_lower:
+        elif event_key == 'contact':
             text = kb.flow_contact or "Contact us or book a table:"
             reply = f"{text}\n\n[Book Now]({kb.reservation_url})" if kb.reservation_url else (text if kb.flow_contact else "Reservations not configured.")
         
         response_data = {"response": reply}
 
-        # Log Interaction
-        log = InteractionLog(
-            client_id=client.id,
-            interaction_type='button_click',
-            user_query=message_content
-        )
-        db.session.add(log)
-        db.session.commit()
+        # Log Interaction (write-behind)
+        LogIngestService.record(client.id, 'button_click', message_content, event_key=event_key)
 
     # Step 4: Handle Text Input (Pro Tier)
     elif message_type == 'text_input':
@@ -121,13 +188,59 @@ def chat():
         ai_reply = generate_smart_reply(message_content, client, kb)
         response_data = {"response": ai_reply}
         
-        # Log Interaction
-        log = InteractionLog(
-            client_id=client.id,
-            interaction_type='ai_chat',
-            user_query=message_content
-        )
-        db.session.add(log)
-        db.session.commit()
+        # Log Interaction (write-behind)
+        LogIngestService.record(client.id, 'ai_chat', message_content)
 
     return jsonify(response_data), 200
+
+@bp.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Streaming variant of /chat for text input (Pro Tier).
+    Relays provider tokens as Server-Sent Events:
+      event: token  data: {"text": "..."}
+      event: done   data: {"response": "<full reply>"}
+    """
+    data = request.get_json() or {}
+    public_id = data.get('public_id')
+    message_content = data.get('message')
+
+    if not public_id:
+        return jsonify({"error": "Missing public_id"}), 400
+
+    client = TenantCache.by_public_id(public_id)
+    if not client:
+        return jsonify({"error": "Client not found"}), 404
+
+    if client.plan_type == 'basic':
+        return jsonify({
+            "error": "Unauthorized", 
+            "message": "Text chat is a Pro feature."
+        }), 403
+
+    import json
+    from app.services.ai_service import AIService
+    kb = client.knowledge_base
+
+    def sse(event, payload):
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    def event_stream():
+        chunks = []
+        try:
+            for chunk in AIService.stream_smart_reply(message_content, client, kb):
+                chunks.append(chunk)
+                yield sse('token', {"text": chunk})
+            yield sse('done', {"response": "".join(chunks)})
+        finally:
+            # Log Interaction once the stream finishes (or the guest disconnects)
+            LogIngestService.record(client.id, 'ai_chat', message_content)
+
+    return Response(
+        stream_with_context(event_stream()),
+        mimetype='text/event-stream',
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no" # Disable nginx proxy buffering
+        }
+    )
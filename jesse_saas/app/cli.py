@@ -0,0 +1,122 @@
+import click
+from datetime import datetime
+from flask import g
+from flask.cli import AppGroup, with_appcontext
+
+analytics_cli = AppGroup('analytics', help='Analytics maintenance commands.')
+schema_cli = AppGroup('schema', help='Schema maintenance commands.')
+prerender_cli = AppGroup('prerender', help='Static pre-rendering of public tenant pages.')
+uploads_cli = AppGroup('uploads', help='Upload pipeline maintenance commands.')
+
+
+@with_appcontext
+def _migrate_options(directory, x_arg):
+    # Read by Migrate.get_config(), as in flask_migrate.cli.db
+    g.directory = directory
+    g.x_arg = x_arg
+
+
+class MigrateGroup(click.Group):
+    """
+    `flask db` without paying for Flask-Migrate on every start: alembic (with
+    mako and pygments) is imported when a db command is first looked up.
+    """
+
+    def __init__(self, app):
+        super().__init__('db', help='Perform database migrations.', callback=_migrate_options, params=[
+            click.Option(['-d', '--directory'], default=None,
+                         help='Migration script directory (default is "migrations")'),
+            click.Option(['-x', '--x-arg'], multiple=True,
+                         help='Additional arguments consumed by custom env.py scripts'),
+        ])
+        self.app = app
+
+    def _load(self):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as db_cli
+        from app.extensions import db
+        if 'migrate' not in self.app.extensions:
+            Migrate(self.app, db)
+        return db_cli
+
+    def list_commands(self, ctx):
+        return self._load().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._load().get_command(ctx, name)
+
+
+@schema_cli.command('sync')
+def schema_sync():
+    """Creates missing tables, columns and indexes and records the schema version."""
+    from app.schema import sync_schema, SCHEMA_VERSION
+
+    added = sync_schema()
+    click.echo(f"✅ Schema synced to {SCHEMA_VERSION}" + (f" (added {', '.join(added)})." if added else "."))
+
+
+@schema_cli.command('status')
+def schema_status():
+    """Shows the recorded schema version against the one this code expects."""
+    from app.schema import recorded_version, SCHEMA_VERSION
+
+    recorded = recorded_version()
+    if recorded == SCHEMA_VERSION:
+        click.echo(f"✅ Schema current ({SCHEMA_VERSION}).")
+    else:
+        click.echo(f"⚠️ Schema {recorded or 'never synced'}, expected {SCHEMA_VERSION}: run `flask schema sync`.")
+
+
+@analytics_cli.command('backfill-rollup')
+@click.option('--client-id', type=int, default=None, help='Only rebuild this client.')
+@click.option('--since', default=None, help='Only rebuild days on or after YYYY-MM-DD.')
+def backfill_rollup(client_id, since):
+    """Rebuilds interaction_daily_rollup from interaction_logs."""
+    from app.services.rollup_service import RollupService
+
+    since_date = datetime.strptime(since, '%Y-%m-%d').date() if since else None
+    written = RollupService.backfill(client_id=client_id, since=since_date)
+    click.echo(f"✅ Rollup rebuilt: {written} buckets written.")
+
+
+@prerender_cli.command('build')
+@click.option('--out', default=None, help='Output directory (defaults to PRERENDER_DIR).')
+@click.option('--force', is_flag=True, help='Re-render every tenant, not only changed ones.')
+@click.option('--base-url', default=None, help='Scheme and host for absolute URLs (defaults to PRERENDER_BASE_URL).')
+def prerender_build(out, force, base_url):
+    """Writes menu, chat and config pages of active clients as static files."""
+    from urllib.parse import urlparse
+    from flask import current_app
+    from app.services.prerender_service import PrerenderService
+
+    out = out or current_app.config.get('PRERENDER_DIR')
+    if not out:
+        raise click.UsageError("Pass --out or set PRERENDER_DIR.")
+    if base_url:
+        current_app.config['PRERENDER_BASE_URL'] = base_url
+    elif urlparse(current_app.config['PRERENDER_BASE_URL']).hostname in ('localhost', '127.0.0.1'):
+        # The absolute image URLs in api/config and api/widget would point at localhost
+        raise click.UsageError(
+            f"PRERENDER_BASE_URL is {current_app.config['PRERENDER_BASE_URL']}: set it (or pass --base-url) "
+            "to the public scheme and host."
+        )
+
+    rendered, skipped, removed = PrerenderService.run(out, force=force)
+    click.echo(f"✅ Prerendered {rendered} tenants into {out} ({skipped} unchanged, {removed} removed).")
+
+
+@uploads_cli.command('process-pending')
+def uploads_process_pending():
+    """Pushes uploads left pending (e.g. by a worker restart) to the storage backend."""
+    from app.services.upload_pipeline import UploadPipeline
+
+    processed = UploadPipeline.process_pending()
+    click.echo(f"✅ Processed {processed} pending uploads.")
+
+
+def register_commands(app):
+    app.cli.add_command(MigrateGroup(app))
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(schema_cli)
+    app.cli.add_command(prerender_cli)
+    app.cli.add_command(uploads_cli)
@@ -1,7 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_cors import CORS
 
 db = SQLAlchemy()
-migrate = Migrate()
 cors = CORS()
+# Flask-Migrate is set up on first use of `flask db` (see app/cli.py)
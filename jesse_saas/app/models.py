@@ -4,6 +4,11 @@ from .extensions import db
 
 class Client(db.Model):
     __tablename__ = 'clients'
+    __table_args__ = (
+        # Admin clients list: status/plan filters walked in id (keyset) order.
+        # Name/public_id search uses pg_trgm GIN indexes on Postgres (migration a47c9e2d81f3).
+        db.Index('ix_clients_status_plan_id', 'status', 'plan_type', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     public_id = db.Column(db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
@@ -67,10 +72,14 @@ class Client(db.Model):
     review_url = db.Column(db.String(255), nullable=True)
     booking_url = db.Column(db.String(255), nullable=True)
 
+    # Cache Invalidation: bumped on every content write (see CacheService)
+    content_version = db.Column(db.Integer, default=1)
+
     # Relationships
     knowledge_base = db.relationship('KnowledgeBase', backref='client', uselist=False, cascade="all, delete-orphan")
     menu_items = db.relationship('MenuItem', backref='client', lazy='dynamic', cascade="all, delete-orphan")
     logs = db.relationship('InteractionLog', backref='client', lazy='dynamic', cascade="all, delete-orphan")
+    rollups = db.relationship('InteractionDailyRollup', backref='client', lazy='dynamic', cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Client {self.restaurant_name} ({self.plan_type})>"
@@ -179,6 +188,16 @@ class MenuItem(db.Model):
 
 class InteractionLog(db.Model):
     __tablename__ = 'interaction_logs'
+    __table_args__ = (
+        # Per-tenant history: counts, trends, CSV export, conversations feed
+        db.Index('ix_interaction_logs_client_ts', 'client_id', 'timestamp'),
+        # Per-tenant breakdowns by type (ai_chat vs button_click)
+        db.Index('ix_interaction_logs_client_type_ts', 'client_id', 'interaction_type', 'timestamp'),
+        # Global live feed on the admin dashboard
+        db.Index('ix_interaction_logs_timestamp', 'timestamp'),
+        # Events breakdown: GROUP BY event_key per tenant
+        db.Index('ix_interaction_logs_client_event', 'client_id', 'event_key'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False)
@@ -189,5 +208,94 @@ class InteractionLog(db.Model):
     user_query = db.Column(db.Text, nullable=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Starter intent of a button click (menu, hours, ...), set at write time; see EventClassifier
+    event_key = db.Column(db.String(50), nullable=True)
+
     def __repr__(self):
         return f"<Log {self.interaction_type} - {self.timestamp}>"
+
+
+class InteractionDailyRollup(db.Model):
+    """
+    Pre-aggregated interaction counts per client, day, type and event.
+    Maintained at ingest (see RollupService); analytics pages read from here
+    instead of scanning interaction_logs.
+    """
+    __tablename__ = 'interaction_daily_rollup'
+    __table_args__ = (
+        db.UniqueConstraint('client_id', 'date', 'interaction_type', 'event', name='uq_interaction_daily_rollup_bucket'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False) # UTC day
+    interaction_type = db.Column(db.String(50), nullable=False)
+    event = db.Column(db.String(50), nullable=False, default='') # Button event for clicks, '' for AI chat
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<Rollup {self.client_id} {self.date} {self.interaction_type}:{self.event} = {self.count}>"
+
+
+class SchemaVersion(db.Model):
+    """
+    Single row (id=1) recording the schema version last applied by
+    `flask schema sync`; lets startup skip schema introspection (see app/schema.py).
+    """
+    __tablename__ = 'schema_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.String(32), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SchemaVersion {self.version}>"
+
+
+class UploadAsset(db.Model):
+    """
+    One stored file, addressed by the sha256 of its bytes: identical uploads
+    (the same dish photo again, one logo for several clients) reuse it instead
+    of writing or transferring a new copy. Pushed to the storage backend by the
+    upload workers (see app/services/upload_pipeline.py); model fields using it
+    are tracked in UploadAssetRef and hold the staged path until the push is done.
+    """
+    __tablename__ = 'upload_assets'
+    __table_args__ = (
+        db.UniqueConstraint('content_hash', name='uq_upload_assets_content_hash'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=True) # sha256 hex
+    status = db.Column(db.String(20), default='pending', nullable=False) # pending, done, failed
+    staged_path = db.Column(db.String(255), nullable=False) # "folder/<sha256>.ext" under UPLOAD_FOLDER
+    folder = db.Column(db.String(50), nullable=False)
+    public_id_prefix = db.Column(db.String(100), nullable=True)
+    url = db.Column(db.String(255), nullable=True) # Final URL (or local path) once pushed
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    refs = db.relationship('UploadAssetRef', backref='asset', lazy='dynamic', cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<UploadAsset {self.id} {self.status} {self.staged_path}>"
+
+
+class UploadAssetRef(db.Model):
+    """Model field using an upload, e.g. ('menu_items', 12, 'image_url'); one row per field."""
+    __tablename__ = 'upload_asset_refs'
+    __table_args__ = (
+        db.UniqueConstraint('target_table', 'target_id', 'target_field', name='uq_upload_asset_refs_target'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    asset_id = db.Column(db.Integer, db.ForeignKey('upload_assets.id'), nullable=False, index=True)
+    target_table = db.Column(db.String(50), nullable=False)
+    target_id = db.Column(db.Integer, nullable=False)
+    target_field = db.Column(db.String(50), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<UploadAssetRef {self.target_table}.{self.target_field}#{self.target_id} -> {self.asset_id}>"
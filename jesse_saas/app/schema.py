@@ -0,0 +1,157 @@
+from datetime import datetime
+from sqlalchemy import text, inspect
+from .extensions import db
+
+# Bump together with every schema change (new Alembic revision or hotfix column).
+# Startup compares it with the version recorded by sync_schema() and skips all
+# schema introspection when they match.
+SCHEMA_VERSION = 'd71f4c2a9e58'
+
+
+def _backfill_event_keys():
+    from .services.event_classifier import EventClassifier
+    EventClassifier.backfill()
+
+
+def _backfill_rollup():
+    from .services.rollup_service import RollupService
+    RollupService.backfill()
+
+
+def _rollup_has_raw_labels():
+    # Rollups written before d71f4c2a9e58 bucketed clicks by their label
+    from .models import InteractionDailyRollup
+    from .services.event_classifier import EVENT_LABELS
+    return db.session.query(InteractionDailyRollup.id).filter(
+        InteractionDailyRollup.interaction_type == 'button_click',
+        InteractionDailyRollup.event.notin_(list(EVENT_LABELS))
+    ).first() is not None
+
+
+def _content_address_uploads():
+    # Same as the 9b6e3a5d1c07 migration: unique hash, and the targets of the
+    # assets written before it move to upload_asset_refs (created by create_all)
+    with db.engine.connect() as conn:
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_upload_assets_content_hash ON upload_assets (content_hash)"
+        ))
+        conn.execute(text("""
+            INSERT INTO upload_asset_refs (asset_id, target_table, target_id, target_field, created_at)
+            SELECT MAX(id), target_table, target_id, target_field, MAX(created_at)
+            FROM upload_assets
+            WHERE target_table IS NOT NULL AND target_id IS NOT NULL AND target_field IS NOT NULL
+            GROUP BY target_table, target_id, target_field
+        """))
+        conn.commit()
+
+
+# Columns added after tables already existed in deployed databases that are not
+# managed by Alembic (Vercel): (table, column, DDL, optional follow-up)
+HOTFIX_COLUMNS = (
+    ('menu_items', 'allergy_info', "ALTER TABLE menu_items ADD COLUMN allergy_info VARCHAR(255)", None),
+    ('menu_items', 'original_price', "ALTER TABLE menu_items ADD COLUMN original_price FLOAT", None),
+    ('menu_items', 'labels', "ALTER TABLE menu_items ADD COLUMN labels VARCHAR(255)", None),
+    # Cache invalidation
+    ('clients', 'content_version', "ALTER TABLE clients ADD COLUMN content_version INTEGER DEFAULT 1", None),
+    # Events breakdown, classifying existing clicks
+    ('interaction_logs', 'event_key', "ALTER TABLE interaction_logs ADD COLUMN event_key VARCHAR(50)", _backfill_event_keys),
+    # Content-addressed uploads, on tables created before the hash existed
+    ('upload_assets', 'content_hash', "ALTER TABLE upload_assets ADD COLUMN content_hash VARCHAR(64)", _content_address_uploads),
+)
+
+
+# Tables derived from existing data: (table, follow-up run once when create_all
+# creates the table in a database that already has the rest of the schema)
+DERIVED_TABLES = (
+    # Daily analytics counters, rebuilt from interaction_logs
+    ('interaction_daily_rollup', _backfill_rollup),
+)
+
+
+def recorded_version():
+    """The schema version stored by the last sync, or None (also if never synced)."""
+    try:
+        with db.engine.connect() as conn:
+            return conn.execute(text("SELECT version FROM schema_version WHERE id = 1")).scalar()
+    except Exception:
+        return None
+
+
+def apply_hotfixes():
+    """Adds any HOTFIX_COLUMNS missing from existing tables. Returns the columns added."""
+    inspector = inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    columns = {}
+    added = []
+
+    for table, column, ddl, follow_up in HOTFIX_COLUMNS:
+        if table not in tables:
+            continue
+        if table not in columns:
+            columns[table] = {c['name'] for c in inspector.get_columns(table)}
+        if column in columns[table]:
+            continue
+
+        print(f"⚠️ Migration: Adding missing '{column}' column...")
+        with db.engine.connect() as conn:
+            conn.execute(text(ddl))
+            conn.commit()
+        if follow_up:
+            follow_up()
+        added.append(f"{table}.{column}")
+        print(f"✅ Migration: '{column}' added.")
+
+    return added
+
+
+def sync_schema():
+    """
+    One-shot schema sync (flask schema sync): creates missing tables (filling
+    DERIVED_TABLES), applies the hotfix columns, creates missing model indexes
+    and records SCHEMA_VERSION.
+    Idempotent; safe to run on every deploy.
+    """
+    from .models import SchemaVersion
+
+    existing = set(inspect(db.engine).get_table_names())
+    db.create_all()
+    added = apply_hotfixes()
+
+    if existing: # A fresh database has no history to derive from
+        for table, follow_up in DERIVED_TABLES:
+            if table not in existing:
+                print(f"⚠️ Migration: Filling new '{table}' table...")
+                follow_up()
+                print(f"✅ Migration: '{table}' filled.")
+        if 'interaction_daily_rollup' in existing and _rollup_has_raw_labels():
+            print("⚠️ Migration: Regrouping rollup clicks by event_key...")
+            _backfill_rollup()
+            print("✅ Migration: Rollup regrouped.")
+
+    # create_all only builds indexes together with their table
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+    row = db.session.get(SchemaVersion, 1) or SchemaVersion(id=1)
+    row.version = SCHEMA_VERSION
+    row.applied_at = datetime.utcnow()
+    db.session.add(row)
+    db.session.commit()
+    return added
+
+
+def check_schema(mode):
+    """
+    Startup schema check, per SCHEMA_STARTUP_CHECK:
+      'auto' - one query for the recorded version; sync only when it differs (default)
+      'sync' - always sync (create_all + introspection, the old behaviour)
+      'skip' - no schema work at all; deploys run `flask schema sync`
+    Returns what was done: 'skipped', 'current' or 'synced'.
+    """
+    if mode == 'skip':
+        return 'skipped'
+    if mode == 'auto' and recorded_version() == SCHEMA_VERSION:
+        return 'current'
+    sync_schema()
+    return 'synced'
@@ -1,8 +1,15 @@
 import os
-import requests
 import json
 from flask import current_app
-from app.models import MenuItem
+from config import Config
+from app.services.cache_service import TTLCache, CacheService
+from app.services.provider_client import ProviderClient
+from app.services.menu_retrieval import MenuRetriever
+from app.services.answer_cache import AnswerCache
+
+# Compiled system prompt frames, keyed by (client_id, content_version)
+_prompt_cache = CacheService.register(TTLCache(maxsize=Config.PROMPT_CACHE_SIZE))
+
 
 class AIService:
     @staticmethod
@@ -11,8 +18,86 @@ class AIService:
         Generates a response using the configured AI provider.
         Supports: Groq, OpenAI, Anthropic, and Generic OpenAI-Compatible.
         Injects MENU DATA into context.
+        Repeated questions are answered from AnswerCache.
+        """
+        cached = AnswerCache.get(client_model, user_message)
+        if cached is not None:
+            return cached
+
+        engine = AIService._resolve_engine(kb)
+        if not engine['api_key']:
+            return f"System Error: AI API Key not configured for provider '{engine['provider']}'."
+
+        # System Prompt (cached per tenant content version)
+        system_prompt = AIService.get_system_prompt(client_model, kb, user_message)
+
+        # Dispatch Request
+        provider = engine['provider']
+        args = (engine['api_key'], engine['model'], system_prompt, user_message, engine['temperature'], engine['max_tokens'])
+        try:
+            if provider == 'openai':
+                reply = AIService._call_openai(*args)
+            elif provider == 'anthropic':
+                reply = AIService._call_anthropic(*args)
+            elif provider == 'openai_compatible':
+                 base_url = ProviderClient.base_url('openai_compatible')
+                 reply = AIService._call_openai_compatible(args[0], base_url, *args[1:])
+            else:
+                # Default to Groq
+                reply = AIService._call_groq(*args)
+
+            AnswerCache.set(client_model, user_message, reply)
+            return reply
+                
+        except Exception as e:
+            print(f"AI Service Error ({provider}): {e}")
+            return "I'm having trouble connecting to my brain right now. Please try again later."
+
+    @staticmethod
+    def stream_smart_reply(user_message, client_model, kb):
+        """
+        Streaming variant of generate_smart_reply.
+        Yields text chunks as the provider produces them (SSE relay in /api/chat/stream).
+        """
+        cached = AnswerCache.get(client_model, user_message)
+        if cached is not None:
+            yield cached
+            return
+
+        engine = AIService._resolve_engine(kb)
+        if not engine['api_key']:
+            yield f"System Error: AI API Key not configured for provider '{engine['provider']}'."
+            return
+
+        system_prompt = AIService.get_system_prompt(client_model, kb, user_message)
+
+        provider = engine['provider']
+        args = (engine['api_key'], engine['model'], system_prompt, user_message, engine['temperature'], engine['max_tokens'])
+        if provider == 'anthropic':
+            chunks = AIService._stream_anthropic(*args)
+        else:
+            # Groq, OpenAI and custom endpoints all speak the OpenAI wire format
+            if provider not in ('openai', 'openai_compatible'):
+                provider = 'groq'
+            base_url = ProviderClient.base_url(provider)
+            chunks = AIService._stream_openai_compatible(args[0], base_url, *args[1:], provider=provider)
+
+        sent = []
+        try:
+            for chunk in chunks:
+                sent.append(chunk)
+                yield chunk
+            AnswerCache.set(client_model, user_message, "".join(sent))
+        except Exception as e:
+            print(f"AI Service Stream Error ({provider}): {e}")
+            if not sent:
+                yield "I'm having trouble connecting to my brain right now. Please try again later."
+
+    @staticmethod
+    def _resolve_engine(kb):
+        """
+        Resolves provider, API key, model and sampling settings (DB -> Env -> Default).
         """
-        
         # 1. Determine Provider (DB -> Env -> Default)
         provider = kb.ai_provider
         if not provider:
@@ -20,18 +105,75 @@ class AIService:
         
         provider = provider.lower()
 
-        # 2a. Fetch Menu Data
-        menu_items = MenuItem.query.filter_by(client_id=client_model.id, is_available=True).all()
-        menu_text = "No menu items available."
-        if menu_items:
-            items_list = []
-            for item in menu_items:
-                price = f"${item.price}" # Assuming generic currency symbol or stored in client setting
-                desc = f": {item.description}" if item.description else ""
-                items_list.append(f"- {item.name} ({price}){desc}")
-            menu_text = "\n".join(items_list)
-        
-        # 2b. Construct Final System Prompt
+        # 2. Determine API Key (DB first, then Env)
+        api_key = kb.ai_api_key
+        if not api_key:
+            # Fallback to Env Vars based on provider
+            if provider == 'openai':
+                api_key = os.environ.get('OPENAI_API_KEY')
+            elif provider == 'anthropic':
+                api_key = os.environ.get('ANTHROPIC_API_KEY')
+            elif provider == 'groq':
+                api_key = os.environ.get('GROQ_API_KEY') or os.environ.get('LLM_API_KEY')
+            elif provider == 'openai_compatible':
+                api_key = os.environ.get('LLM_API_KEY')
+
+        # 3. Determine Model (DB -> Env -> Default)
+        model = kb.ai_model
+        if not model:
+            if provider == 'openai':
+                model = 'gpt-4o-mini'
+            elif provider == 'anthropic':
+                model = 'claude-3-haiku-20240307'
+            elif provider == 'groq':
+                model = 'llama-3.1-8b-instant'
+            else:
+                 # Generic Fallback
+                 model = os.environ.get('LLM_MODEL', 'llama-3.1-8b-instant')
+
+        # 4. Settings
+        try:
+            temp = float(kb.temperature) if kb.temperature is not None else 0.7
+            max_tokens = int(kb.max_tokens) if kb.max_tokens else 300 # Increased for menu listing
+        except:
+            temp = 0.7
+            max_tokens = 300
+
+        return {
+            'provider': provider,
+            'api_key': api_key,
+            'model': model,
+            'temperature': temp,
+            'max_tokens': max_tokens
+        }
+
+    @staticmethod
+    def get_system_prompt(client_model, kb, user_message=None):
+        """
+        Returns the system prompt for a tenant and guest question.
+        The persona/context/guidelines frame is cached per (client id, content version);
+        admin writes bump the version. The menu block is retrieved per question.
+        """
+        key = (client_model.id, client_model.content_version)
+        frame = _prompt_cache.get(key)
+        if frame is None:
+            frame = AIService._build_prompt_frame(client_model, kb)
+            _prompt_cache.set(key, frame)
+
+        # Menu Context: only the items relevant to the question (see MenuRetriever)
+        menu_text = MenuRetriever.build_menu_text(client_model, user_message)
+        menu_context = f"\nMENU ITEMS (Live Database):\n{menu_text}\n"
+
+        head, guidelines = frame
+        return f"{head}\n{menu_context}\n{guidelines}"
+
+    @staticmethod
+    def _build_prompt_frame(client_model, kb):
+        """
+        Builds the menu-independent parts of the system prompt.
+        Returns (persona + data context, guidelines); the menu goes between them.
+        """
+        # Construct Final System Prompt
         # Strategy: Combine User Persona (or Default) + Data Context + Menu + Guidelines
         
         # A. Persona (Role & Tone)
@@ -127,10 +269,7 @@ CONTEXT (Read-Only):
 {starters_context}
 """
 
-        # C. Menu Context (Already fetched above)
-        menu_context = f"\nMENU ITEMS (Live Database):\n{menu_text}\n"
-
-        # D. Functional Guidelines
+        # C. Functional Guidelines
         guidelines = f"""
 GUIDELINES:
 - You represent {client_model.restaurant_name}. Use the tone defined in the persona above.
@@ -141,81 +280,29 @@ GUIDELINES:
 - If the user asks for a reservation, answer polite AND append: [BUTTON:Book a Table|link:{kb.reservation_url or '#'}]
 """
 
-        # Combine All
-        system_prompt = f"{persona}\n{context_data}\n{menu_context}\n{guidelines}"
-
-        # 3. Determine API Key (DB first, then Env)
-        api_key = kb.ai_api_key
-        if not api_key:
-            # Fallback to Env Vars based on provider
-            if provider == 'openai':
-                api_key = os.environ.get('OPENAI_API_KEY')
-            elif provider == 'anthropic':
-                api_key = os.environ.get('ANTHROPIC_API_KEY')
-            elif provider == 'groq':
-                api_key = os.environ.get('GROQ_API_KEY') or os.environ.get('LLM_API_KEY')
-            elif provider == 'openai_compatible':
-                api_key = os.environ.get('LLM_API_KEY')
-
-        if not api_key:
-            return f"System Error: AI API Key not configured for provider '{provider}'."
-
-        # 4. Determine Model (DB -> Env -> Default)
-        model = kb.ai_model
-        if not model:
-            if provider == 'openai':
-                model = 'gpt-4o-mini'
-            elif provider == 'anthropic':
-                model = 'claude-3-haiku-20240307'
-            elif provider == 'groq':
-                model = 'llama-3.1-8b-instant'
-            else:
-                 # Generic Fallback
-                 model = os.environ.get('LLM_MODEL', 'llama-3.1-8b-instant')
-
-        # 5. Settings
-        try:
-            temp = float(kb.temperature) if kb.temperature is not None else 0.7
-            max_tokens = int(kb.max_tokens) if kb.max_tokens else 300 # Increased for menu listing
-        except:
-            temp = 0.7
-            max_tokens = 300
-
-        # 6. Dispatch Request
-        try:
-            if provider == 'openai':
-                return AIService._call_openai(api_key, model, system_prompt, user_message, temp, max_tokens)
-            elif provider == 'anthropic':
-                return AIService._call_anthropic(api_key, model, system_prompt, user_message, temp, max_tokens)
-            elif provider == 'openai_compatible':
-                 base_url = os.environ.get('LLM_BASE_URL', "https://api.groq.com/openai/v1")
-                 return AIService._call_openai_compatible(api_key, base_url, model, system_prompt, user_message, temp, max_tokens)
-            else:
-                # Default to Groq
-                return AIService._call_groq(api_key, model, system_prompt, user_message, temp, max_tokens)
-                
-        except Exception as e:
-            print(f"AI Service Error ({provider}): {e}")
-            return "I'm having trouble connecting to my brain right now. Please try again later."
+        # Combine All (Menu Context is inserted per question)
+        return f"{persona}\n{context_data}", guidelines
 
     @staticmethod
     def _call_groq(api_key, model, system, user, temp, tokens):
         return AIService._call_openai_compatible(
             api_key, 
-            "https://api.groq.com/openai/v1", 
-            model, system, user, temp, tokens
+            ProviderClient.base_url('groq'), 
+            model, system, user, temp, tokens,
+            provider='groq'
         )
 
     @staticmethod
     def _call_openai(api_key, model, system, user, temp, tokens):
         return AIService._call_openai_compatible(
             api_key, 
-            "https://api.openai.com/v1", 
-            model, system, user, temp, tokens
+            ProviderClient.base_url('openai'), 
+            model, system, user, temp, tokens,
+            provider='openai'
         )
 
     @staticmethod
-    def _call_openai_compatible(api_key, base_url, model, system, user, temp, tokens):
+    def _call_openai_compatible(api_key, base_url, model, system, user, temp, tokens, provider='openai_compatible'):
         # Normalize URL
         if base_url.endswith('/chat/completions'):
              base_url = base_url.replace('/chat/completions', '')
@@ -235,13 +322,13 @@ GUIDELINES:
             "temperature": temp,
             "max_tokens": tokens
         }
-        resp = requests.post(target_url, headers=headers, json=payload, timeout=25)
+        resp = ProviderClient.post(provider, target_url, headers=headers, json=payload)
         resp.raise_for_status()
         return resp.json()['choices'][0]['message']['content']
 
     @staticmethod
     def _call_anthropic(api_key, model, system, user, temp, tokens):
-        url = "https://api.anthropic.com/v1/messages"
+        url = f"{ProviderClient.base_url('anthropic').rstrip('/')}/messages"
         headers = {
             "x-api-key": api_key,
             "anthropic-version": "2023-06-01",
@@ -256,10 +343,79 @@ GUIDELINES:
             "max_tokens": tokens,
             "temperature": temp
         }
-        resp = requests.post(url, headers=headers, json=payload, timeout=10)
+        resp = ProviderClient.post('anthropic', url, headers=headers, json=payload)
         resp.raise_for_status()
         return resp.json()['content'][0]['text']
 
+    @staticmethod
+    def _iter_sse_data(resp):
+        """Yields the parsed JSON payload of each `data:` line in a provider SSE stream."""
+        for line in resp.iter_lines(decode_unicode=True):
+            if not line or not line.startswith('data:'):
+                continue
+            data = line[len('data:'):].strip()
+            if data == '[DONE]':
+                return
+            yield json.loads(data)
+
+    @staticmethod
+    def _stream_openai_compatible(api_key, base_url, model, system, user, temp, tokens, provider='openai_compatible'):
+        # Normalize URL
+        if base_url.endswith('/chat/completions'):
+             base_url = base_url.replace('/chat/completions', '')
+        base_url = base_url.rstrip('/')
+        target_url = f"{base_url}/chat/completions"
+
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": user}
+            ],
+            "temperature": temp,
+            "max_tokens": tokens,
+            "stream": True
+        }
+        with ProviderClient.post(provider, target_url, headers=headers, json=payload, stream=True) as resp:
+            resp.raise_for_status()
+            for event in AIService._iter_sse_data(resp):
+                choices = event.get('choices') or [{}]
+                text = (choices[0].get('delta') or {}).get('content')
+                if text:
+                    yield text
+
+    @staticmethod
+    def _stream_anthropic(api_key, model, system, user, temp, tokens):
+        url = f"{ProviderClient.base_url('anthropic').rstrip('/')}/messages"
+        headers = {
+            "x-api-key": api_key,
+            "anthropic-version": "2023-06-01",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "model": model,
+            "system": system,
+            "messages": [
+                {"role": "user", "content": user}
+            ],
+            "max_tokens": tokens,
+            "temperature": temp,
+            "stream": True
+        }
+        with ProviderClient.post('anthropic', url, headers=headers, json=payload, stream=True) as resp:
+            resp.raise_for_status()
+            for event in AIService._iter_sse_data(resp):
+                if event.get('type') == 'content_block_delta':
+                    text = (event.get('delta') or {}).get('text')
+                    if text:
+                        yield text
+                elif event.get('type') == 'message_stop':
+                    return
+
 # Legacy Alias
 def generate_smart_reply(user_message, client_model, kb):
     return AIService.generate_smart_reply(user_message, client_model, kb)
@@ -1,29 +1,55 @@
-from app.models import Client, InteractionLog
+from app.models import Client, InteractionLog, InteractionDailyRollup
+from app.services.event_classifier import EVENT_KEYWORDS, EVENT_LABELS, OTHER_EVENT
+from app.services.cache_service import TTLCache, CacheService
+from app.services.tenant_cache import Snapshot
 from config import Config
 from app.extensions import db
-from sqlalchemy import func
+from sqlalchemy import func, case
+from sqlalchemy.orm import joinedload
 from datetime import datetime, timedelta
 import csv
 import io
+import zlib
+
+# Global admin dashboard numbers: not per tenant, so they expire on a short TTL
+_dashboard_cache = CacheService.register(TTLCache(maxsize=16, ttl=Config.DASHBOARD_CACHE_TTL))
 
 class AnalyticsService:
+    @staticmethod
+    def _rollup_total(*filters):
+        """Sums interaction counts from the daily rollup."""
+        total = db.session.query(func.sum(InteractionDailyRollup.count)).filter(*filters).scalar()
+        return int(total or 0)
+
     @staticmethod
     def get_dashboard_stats():
         """
         Calculate high-level dashboard metrics for the SaaS admin.
+        One round trip (conditional aggregation), cached for DASHBOARD_CACHE_TTL seconds.
         """
-        total_clients = Client.query.count()
-        pro_clients = Client.query.filter_by(plan_type='pro').count()
-        basic_clients = Client.query.filter_by(plan_type='basic').count()
+        key = ('dashboard', 'stats')
+        stats = _dashboard_cache.get(key)
+        if stats is not None:
+            return stats
+
+        # Usage comes from the daily rollup, not a log table scan
+        interactions = db.session.query(
+            func.coalesce(func.sum(InteractionDailyRollup.count), 0)
+        ).scalar_subquery()
+
+        total_clients, pro_clients, basic_clients, total_interactions = db.session.query(
+            func.count(Client.id),
+            func.coalesce(func.sum(case((Client.plan_type == 'pro', 1), else_=0)), 0),
+            func.coalesce(func.sum(case((Client.plan_type == 'basic', 1), else_=0)), 0),
+            interactions
+        ).one()
+        pro_clients, basic_clients, total_interactions = int(pro_clients), int(basic_clients), int(total_interactions)
         
         # Financials
         monthly_mrr = pro_clients * Config.PRICING_PRO_MONTHLY
-        
-        # Usage
-        total_interactions = InteractionLog.query.count()
         token_cost_est = total_interactions * Config.TOKEN_COST_PER_INTERACTION
         
-        return {
+        stats = {
             'total_clients': total_clients,
             'pro_clients': pro_clients,
             'basic_clients': basic_clients,
@@ -31,6 +57,17 @@ class AnalyticsService:
             'total_interactions': total_interactions,
             'token_cost': round(token_cost_est, 2)
         }
+        _dashboard_cache.set(key, stats)
+        return stats
+
+    @staticmethod
+    def get_live_feed(limit=15):
+        """
+        Latest interactions across all clients, with their client in the same query
+        (the feed shows each log's restaurant name).
+        """
+        return InteractionLog.query.options(joinedload(InteractionLog.client))\
+            .order_by(InteractionLog.timestamp.desc()).limit(limit).all()
 
     @staticmethod
     def get_client_overview(client_id):
@@ -41,8 +78,11 @@ class AnalyticsService:
         if not client:
             return {}
 
-        total = client.logs.count()
-        ai_chats = client.logs.filter_by(interaction_type='ai_chat').count()
+        total = AnalyticsService._rollup_total(InteractionDailyRollup.client_id == client_id)
+        ai_chats = AnalyticsService._rollup_total(
+            InteractionDailyRollup.client_id == client_id,
+            InteractionDailyRollup.interaction_type == 'ai_chat'
+        )
         
         # Calculate AI Ratio
         ai_ratio = round((ai_chats / total * 100), 1) if total > 0 else 0
@@ -67,15 +107,15 @@ class AnalyticsService:
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        # Query: Count logs per day
+        # Query: Count per day from the daily rollup
         logs = db.session.query(
-            func.date(InteractionLog.timestamp).label('date'),
-            func.count(InteractionLog.id).label('count')
+            InteractionDailyRollup.date.label('date'),
+            func.sum(InteractionDailyRollup.count).label('count')
         ).filter(
-            InteractionLog.client_id == client_id,
-            InteractionLog.timestamp >= start_date
+            InteractionDailyRollup.client_id == client_id,
+            InteractionDailyRollup.date >= start_date.date()
         ).group_by(
-            func.date(InteractionLog.timestamp)
+            InteractionDailyRollup.date
         ).all()
         
         # Convert to dictionary {date: count}
@@ -97,63 +137,122 @@ class AnalyticsService:
         }
 
     @staticmethod
-    def get_export_csv(client_id):
+    def get_events_breakdown(client_id):
         """
-        Generates CSV content for client logs.
+        Button clicks per starter intent: one SUM over the daily rollup grouped by
+        event (the event_key), instead of scanning interaction_logs.
+        Every intent is listed (zero-filled) in dispatch order, 'Other' last.
         """
-        client = Client.query.get(client_id)
-        logs = client.logs.order_by(InteractionLog.timestamp.desc()).all()
-        
+        counts = dict(db.session.query(
+            InteractionDailyRollup.event,
+            func.sum(InteractionDailyRollup.count)
+        ).filter(
+            InteractionDailyRollup.client_id == client_id,
+            InteractionDailyRollup.interaction_type == 'button_click'
+        ).group_by(InteractionDailyRollup.event).all())
+
+        keys = [key for key, _ in EVENT_KEYWORDS] + [OTHER_EVENT]
+        return {EVENT_LABELS[key]: int(counts.get(key) or 0) for key in keys}
+
+    @staticmethod
+    def iter_export_csv(client_id, start_date=None, end_date=None, batch_size=1000):
+        """
+        Streams client logs as CSV chunks, newest first, in constant memory.
+        Rows are fetched yield_per batch (a server-side cursor on Postgres) and
+        each batch is written out as one chunk. Dates are inclusive UTC days.
+        """
+        query = db.session.query(
+            InteractionLog.timestamp,
+            InteractionLog.interaction_type,
+            InteractionLog.user_query
+        ).filter(InteractionLog.client_id == client_id)
+
+        if start_date:
+            query = query.filter(InteractionLog.timestamp >= datetime.combine(start_date, datetime.min.time()))
+        if end_date:
+            query = query.filter(InteractionLog.timestamp < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+
         output = io.StringIO()
         writer = csv.writer(output)
-        
+
         # Headers
         writer.writerow(['Timestamp', 'Type', 'Query/Content'])
-        
-        # Rows
-        for log in logs:
+
+        rows = query.order_by(InteractionLog.timestamp.desc()).yield_per(batch_size)
+        for count, log in enumerate(rows, 1):
             writer.writerow([
-                log.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                log.timestamp.strftime('%Y-%m-%d %H:%M:%S') if log.timestamp else '',
                 log.interaction_type,
                 log.user_query
             ])
-            
-        return output.getvalue()
+            if count % batch_size == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+
+        if output.tell():
+            yield output.getvalue()
+
+    @staticmethod
+    def gzip_chunks(chunks):
+        """Gzips a stream of text chunks on the fly (single gzip member)."""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) # wbits 31 = gzip container
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode('utf-8'))
+            if data:
+                yield data
+        yield compressor.flush()
+
+    @staticmethod
+    def get_export_csv(client_id, start_date=None, end_date=None):
+        """
+        Generates CSV content for client logs as one string.
+        Prefer iter_export_csv for responses; this materialises the whole export.
+        """
+        return ''.join(AnalyticsService.iter_export_csv(client_id, start_date, end_date))
 
     @staticmethod
     def get_top_clients(limit=5):
         """
-        Efficiently fetches top 5 clients by interaction volume using SQL group_by.
+        Efficiently fetches top 5 clients by interaction volume from the daily rollup.
+        Returned as read-only snapshots with interaction_count, cached like the dashboard stats.
         """
+        key = ('dashboard', 'top_clients', limit)
+        top_clients = _dashboard_cache.get(key)
+        if top_clients is not None:
+            return top_clients
+
+        totals = db.session.query(
+            InteractionDailyRollup.client_id.label('client_id'),
+            func.sum(InteractionDailyRollup.count).label('total')
+        ).group_by(InteractionDailyRollup.client_id).subquery()
+
+        interaction_count = func.coalesce(totals.c.total, 0)
         results = db.session.query(
             Client, 
-            func.count(InteractionLog.id).label('interaction_count')
-        ).outerjoin(InteractionLog, Client.id == InteractionLog.client_id)\
-         .group_by(Client.id)\
-         .order_by(func.count(InteractionLog.id).desc())\
+            interaction_count.label('interaction_count')
+        ).outerjoin(totals, Client.id == totals.c.client_id)\
+         .order_by(interaction_count.desc())\
          .limit(limit).all()
         
-        top_clients = []
-        for client, count in results:
-            client.interaction_count = count
-            top_clients.append(client)
-            
+        top_clients = [Snapshot(client, interaction_count=int(count)) for client, count in results]
+        _dashboard_cache.set(key, top_clients)
         return top_clients
 
     @staticmethod
     def get_client_stats(status_filter='all', plan_filter='all'):
         """
         Get aggregated client statistics for the clients list view.
+        One aggregate query; counters cover all clients regardless of the filters.
         """
-        clients_query = Client.query
-        
-        if status_filter != 'all':
-            clients_query = clients_query.filter_by(status=status_filter)
-        if plan_filter != 'all':
-            clients_query = clients_query.filter_by(plan_type=plan_filter)
-            
+        total, active, pending = db.session.query(
+            func.count(Client.id),
+            func.coalesce(func.sum(case((Client.status == 'active', 1), else_=0)), 0),
+            func.coalesce(func.sum(case((Client.status == 'inactive', 1), else_=0)), 0)
+        ).one()
+
         return {
-            "total": Client.query.count(),
-            "active": Client.query.filter_by(status='active').count(),
-            "pending": Client.query.filter_by(status='inactive').count()
+            "total": total,
+            "active": int(active),
+            "pending": int(pending)
         }
@@ -0,0 +1,125 @@
+import hashlib
+import re
+import unicodedata
+from config import Config
+from app.services.cache_service import TTLCache, CacheService
+
+PUNCTUATION_RE = re.compile(r'[^\w\s]', re.UNICODE)
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_question(text):
+    """'  Do you have WiFi?? ' -> 'do you have wifi'"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    text = PUNCTUATION_RE.sub(' ', text)
+    return WHITESPACE_RE.sub(' ', text).strip()
+
+
+class LocalAnswerBackend:
+    """In-process LRU + TTL store (per worker)."""
+
+    def __init__(self, maxsize, ttl):
+        self.cache = CacheService.register(TTLCache(maxsize=maxsize, ttl=ttl))
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value)
+
+
+class RedisAnswerBackend:
+    """Shared store for all workers. Eviction is left to Redis (TTL + maxmemory-policy)."""
+
+    def __init__(self, client, ttl):
+        self.client = client
+        self.ttl = ttl
+
+    @staticmethod
+    def _redis_key(key):
+        client_id, version, question = key
+        digest = hashlib.sha1(question.encode('utf-8')).hexdigest()
+        return f"jesse:answer:{client_id}:{version}:{digest}"
+
+    def get(self, key):
+        try:
+            value = self.client.get(self._redis_key(key))
+        except Exception as e:
+            print(f"Answer Cache Error (redis): {e}")
+            return None
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key, value):
+        try:
+            self.client.set(self._redis_key(key), value, ex=self.ttl)
+        except Exception as e:
+            print(f"Answer Cache Error (redis): {e}")
+
+
+_backend = None
+
+
+class AnswerCache:
+    """
+    Cache of AI replies for repeated guest questions.
+    Keyed by (client id, content version, normalized question), so any admin
+    edit to the KB, menu or AI settings starts the tenant with a fresh cache.
+    """
+    hits = 0
+    misses = 0
+
+    @staticmethod
+    def backend():
+        global _backend
+        if _backend is None:
+            if Config.ANSWER_CACHE_REDIS_URL:
+                # Optional dependency, only imported when a Redis URL is configured
+                try:
+                    import redis
+                    _backend = RedisAnswerBackend(redis.Redis.from_url(Config.ANSWER_CACHE_REDIS_URL),
+                                                  Config.ANSWER_CACHE_TTL)
+                except ImportError:
+                    print("⚠️ Answer Cache: REDIS_URL is set but redis is not installed, caching per worker")
+            if _backend is None:
+                _backend = LocalAnswerBackend(Config.ANSWER_CACHE_SIZE, Config.ANSWER_CACHE_TTL)
+        return _backend
+
+    @staticmethod
+    def key(client_model, question):
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+        return (client_model.id, client_model.content_version, normalized)
+
+    @staticmethod
+    def get(client_model, question):
+        if not Config.ANSWER_CACHE_ENABLED:
+            return None
+        key = AnswerCache.key(client_model, question)
+        if key is None:
+            return None
+
+        answer = AnswerCache.backend().get(key)
+        if answer is None:
+            AnswerCache.misses += 1
+        else:
+            AnswerCache.hits += 1
+        return answer
+
+    @staticmethod
+    def set(client_model, question, answer):
+        if not Config.ANSWER_CACHE_ENABLED or not answer:
+            return
+        key = AnswerCache.key(client_model, question)
+        if key is not None:
+            AnswerCache.backend().set(key, answer)
+
+    @staticmethod
+    def stats():
+        total = AnswerCache.hits + AnswerCache.misses
+        return {
+            'backend': type(AnswerCache.backend()).__name__,
+            'hits': AnswerCache.hits,
+            'misses': AnswerCache.misses,
+            'hit_rate': round(AnswerCache.hits / total * 100, 1) if total else 0
+        }
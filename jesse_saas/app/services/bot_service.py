@@ -2,7 +2,8 @@ from werkzeug.utils import secure_filename
 from flask import current_app
 from app.extensions import db
 from app.models import KnowledgeBase
-from app.services.upload_service import UploadService
+from app.services.upload_pipeline import UploadPipeline
+from app.services.cache_service import CacheService
 
 class BotService:
     @staticmethod
@@ -45,9 +46,7 @@ class BotService:
         # Check for new upload
         if 'welcome_image' in files:
             file = files['welcome_image']
-            url = UploadService.upload(file, folder='welcome', public_id_prefix=client.public_id)
-            if url:
-                kb.welcome_image_url = url
+            UploadPipeline.submit(file, kb, 'welcome_image_url', folder='welcome', public_id_prefix=client.public_id)
 
         # 4. Book Assets (Cover & Logo)
         
@@ -62,16 +61,12 @@ class BotService:
         # Book Cover Upload
         if 'book_cover' in files:
             file = files['book_cover']
-            url = UploadService.upload(file, folder='menu', public_id_prefix=f"cover_{client.public_id}")
-            if url:
-                kb.book_cover_image = url
+            UploadPipeline.submit(file, kb, 'book_cover_image', folder='menu', public_id_prefix=f"cover_{client.public_id}")
                 
         # Book Logo
         if 'book_logo' in files:
             file = files['book_logo']
-            url = UploadService.upload(file, folder='menu', public_id_prefix=f"logo_{client.public_id}")
-            if url:
-                kb.book_logo_image = url
+            UploadPipeline.submit(file, kb, 'book_logo_image', folder='menu', public_id_prefix=f"logo_{client.public_id}")
                 
         # 5. Last Page Content
         if 'last_page_title' in form_data:
@@ -87,6 +82,7 @@ class BotService:
         if 'toc_footer_text' in form_data:
             kb.toc_footer_text = form_data.get('toc_footer_text')
 
+        CacheService.bump_version(client)
         db.session.commit()
         return kb
 
@@ -112,6 +108,7 @@ class BotService:
         if new_key and new_key.strip():
             kb.ai_api_key = new_key.strip()
             
+        CacheService.bump_version(client)
         db.session.commit()
         return kb
 
@@ -124,5 +121,6 @@ class BotService:
         client.operating_hours = form_data.get('operating_hours')
         kb.human_handoff_triggers = form_data.get('human_handoff_triggers')
         
+        CacheService.bump_version(client)
         db.session.commit()
         return kb
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache with an optional time-to-live.
+    Used for per-process caches of data derived from tenant content.
+    """
+
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete_where(self, predicate):
+        """Drops every entry whose key matches the predicate."""
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def delete_values_where(self, predicate):
+        """Drops every entry whose value matches the predicate."""
+        with self._lock:
+            for key in [k for k, (v, _) in self._data.items() if predicate(v)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CacheService:
+    """
+    Tenant content versioning.
+    Every admin write that changes what guests see bumps Client.content_version,
+    so caches keyed by (client_id, content_version, ...) miss on every worker.
+    Registered caches also drop the current process's stale entries right away.
+    """
+    _caches = []
+    _listeners = []
+
+    @staticmethod
+    def register(cache):
+        """
+        Registers a per-process cache. On bump, entries whose key starts with
+        the client id are dropped; all registered caches are emptied by clear_all.
+        """
+        CacheService._caches.append(cache)
+        return cache
+
+    @staticmethod
+    def on_invalidate(listener):
+        """Registers a callable(client) for caches that are not keyed by client id."""
+        CacheService._listeners.append(listener)
+        return listener
+
+    @staticmethod
+    def bump_version(client):
+        """
+        Marks the tenant's content as changed. The caller commits the session.
+        """
+        client.content_version = (client.content_version or 0) + 1
+        client_id = client.id
+        for cache in CacheService._caches:
+            cache.delete_where(lambda key: key[0] == client_id)
+        for listener in CacheService._listeners:
+            listener(client)
+        return client.content_version
+
+    @staticmethod
+    def clear_all():
+        for cache in CacheService._caches:
+            cache.clear()
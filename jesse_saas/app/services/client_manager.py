@@ -10,9 +10,50 @@ except ImportError:
 
 from app.models import Client, KnowledgeBase
 from app.extensions import db
-from app.services.upload_service import UploadService
+from app.services.upload_pipeline import UploadPipeline
+from app.services.cache_service import CacheService
 
 class ClientManager:
+    @staticmethod
+    def search_clients(query='', status_filter='all', plan_filter='all', after=None, before=None, limit=50):
+        """
+        One page of the admin clients list, filtered and searched in SQL.
+        Keyset-paginated on id: pass `after` (next page) or `before` (previous page).
+        Returns (clients, prev_cursor, next_cursor); a cursor is None at either end.
+        """
+        clients_query = Client.query
+
+        if status_filter != 'all':
+            clients_query = clients_query.filter_by(status=status_filter)
+        if plan_filter != 'all':
+            clients_query = clients_query.filter_by(plan_type=plan_filter)
+
+        # Case-insensitive substring: ILIKE on Postgres (pg_trgm GIN indexes), lower() LIKE on SQLite
+        query = (query or '').strip()
+        if query:
+            clients_query = clients_query.filter(db.or_(
+                Client.restaurant_name.icontains(query, autoescape=True),
+                Client.public_id.icontains(query, autoescape=True)
+            ))
+
+        # Fetch one extra row to know whether another page exists in that direction
+        if before is not None:
+            rows = clients_query.filter(Client.id < before).order_by(Client.id.desc()).limit(limit + 1).all()
+            has_more = len(rows) > limit
+            clients = list(reversed(rows[:limit]))
+            prev_cursor = clients[0].id if clients and has_more else None
+            next_cursor = clients[-1].id if clients else None
+        else:
+            if after is not None:
+                clients_query = clients_query.filter(Client.id > after)
+            rows = clients_query.order_by(Client.id.asc()).limit(limit + 1).all()
+            has_more = len(rows) > limit
+            clients = rows[:limit]
+            prev_cursor = clients[0].id if clients and after is not None else None
+            next_cursor = clients[-1].id if clients and has_more else None
+
+        return clients, prev_cursor, next_cursor
+
     @staticmethod
     def create_client(restaurant_name, plan_type):
         """
@@ -89,10 +130,9 @@ class ClientManager:
         if files and 'avatar' in files:
             file = files['avatar']
             if file and file.filename != '':
-                # Upload via Service
-                url = UploadService.upload(file, folder='avatars', public_id_prefix=client.public_id)
-                if url:
-                    client.knowledge_base.avatar_image = url
+                # Upload via Service (pushed to the backend after commit)
+                UploadPipeline.submit(file, client.knowledge_base, 'avatar_image', folder='avatars', public_id_prefix=client.public_id)
 
+        CacheService.bump_version(client)
         db.session.commit()
         return client
@@ -0,0 +1,61 @@
+from sqlalchemy import case, func
+from app.extensions import db
+from app.models import InteractionLog
+
+# Starter intents in the order /api/chat dispatches them (first match wins).
+# Keep in sync with the backfill in migration 5c1e0a7d4b2f.
+EVENT_KEYWORDS = (
+    ('menu', ('menu',)),
+    ('wifi', ('wifi',)),
+    ('hours', ('hours',)),
+    ('location', ('location',)),
+    ('about', ('about',)),
+    ('contact', ('reservation', 'contact')),
+)
+OTHER_EVENT = 'other'
+
+EVENT_LABELS = {
+    'menu': 'Menu Clicks',
+    'wifi': 'WiFi Clicks',
+    'hours': 'Hours Clicks',
+    'location': 'Location Clicks',
+    'about': 'About Clicks',
+    'contact': 'Contact Clicks',
+    OTHER_EVENT: 'Other Clicks',
+}
+
+
+class EventClassifier:
+    """
+    Maps a button click label to the starter intent it triggers, so analytics
+    can GROUP BY the indexed interaction_logs.event_key instead of LIKE scans.
+    """
+
+    @staticmethod
+    def classify(label):
+        text = (label or '').lower()
+        for key, keywords in EVENT_KEYWORDS:
+            if any(word in text for word in keywords):
+                return key
+        return OTHER_EVENT
+
+    @staticmethod
+    def backfill():
+        """
+        Classifies button clicks logged before event_key existed, in one UPDATE.
+        Returns the number of rows updated.
+        """
+        text = func.lower(func.coalesce(InteractionLog.user_query, ''))
+        key = case(
+            *[(text.contains(word, autoescape=True), event_key)
+              for event_key, keywords in EVENT_KEYWORDS for word in keywords],
+            else_=OTHER_EVENT
+        )
+        result = db.session.execute(
+            InteractionLog.__table__.update()
+            .where(InteractionLog.interaction_type == 'button_click',
+                   InteractionLog.event_key.is_(None))
+            .values(event_key=key)
+        )
+        db.session.commit()
+        return result.rowcount
@@ -0,0 +1,103 @@
+import os
+import glob
+import re
+from flask import current_app
+
+# Local variant files: "<folder>/<stem>.w<width>.<format>" next to the original
+VARIANT_NAME = re.compile(r"\.w(\d+)\.(\w+)$")
+
+PIL_FORMATS = {'webp': 'WEBP', 'avif': 'AVIF', 'jpg': 'JPEG'}
+
+
+class ImageService:
+    """
+    Responsive variants for locally stored uploads (Cloudinary transforms on the fly).
+    On upload each image is resized to the configured widths and saved as WebP/AVIF;
+    templates pick them up through resolve_srcset. Needs Pillow (requirements.txt);
+    without it uploads keep working and pages fall back to the original file.
+    """
+
+    @staticmethod
+    def variant_path(path, width, fmt):
+        return f"{path.rsplit('.', 1)[0]}.w{width}.{fmt}"
+
+    @staticmethod
+    def create_variants(path):
+        """
+        Writes the variants of an uploaded file ("folder/file.ext", relative to
+        UPLOAD_FOLDER). Never upscales: widths above the original are replaced by
+        the original width. Returns the variant paths written.
+        """
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            print(f"⚠️ Pillow is not installed: no image variants for {path}")
+            return []
+
+        upload_folder = current_app.config['UPLOAD_FOLDER']
+        widths = current_app.config['IMAGE_VARIANT_WIDTHS']
+        supported = Image.registered_extensions()
+        formats = [fmt for fmt in current_app.config['IMAGE_VARIANT_FORMATS'] if f'.{fmt}' in supported]
+        written = []
+
+        try:
+            with Image.open(os.path.join(upload_folder, path)) as original:
+                if getattr(original, 'is_animated', False):
+                    return [] # Resizing would drop the animation
+                img = ImageOps.exif_transpose(original)
+                if img.mode not in ('RGB', 'RGBA'):
+                    img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+
+                targets = sorted({min(width, img.width) for width in widths})
+                for width in targets:
+                    resized = img if width == img.width else img.resize(
+                        (width, max(1, round(img.height * width / img.width))), Image.LANCZOS
+                    )
+                    for fmt in formats:
+                        variant = ImageService.variant_path(path, width, fmt)
+                        resized.save(os.path.join(upload_folder, variant), PIL_FORMATS.get(fmt, fmt.upper()),
+                                     quality=current_app.config['IMAGE_VARIANT_QUALITY'])
+                        written.append(variant)
+        except Exception as e:
+            print(f"⚠️ Image variants failed for {path}: {e}")
+        return written
+
+    @staticmethod
+    def downscale(file_path, max_dimension):
+        """
+        Shrinks an image in place so neither side exceeds max_dimension (0 disables).
+        Returns True when the file was rewritten. Animated images are left alone.
+        """
+        if not max_dimension:
+            return False
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            print(f"⚠️ Pillow is not installed: {file_path} kept at full size")
+            return False
+
+        try:
+            with Image.open(file_path) as original:
+                if getattr(original, 'is_animated', False) or max(original.size) <= max_dimension:
+                    return False
+                image_format = original.format
+                img = ImageOps.exif_transpose(original) # Orientation survives dropping EXIF
+                img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+                img.load()
+            img.save(file_path, image_format, quality=current_app.config['IMAGE_VARIANT_QUALITY'] + 10)
+            return True
+        except Exception as e:
+            print(f"⚠️ Downscale failed for {file_path}: {e}")
+            return False
+
+    @staticmethod
+    def variants(path, fmt):
+        """[(width, variant_path)] of existing variants in one format, narrowest first."""
+        upload_folder = current_app.config['UPLOAD_FOLDER']
+        pattern = glob.escape(os.path.join(upload_folder, path.rsplit('.', 1)[0])) + f".w*.{fmt}"
+        found = []
+        for file_path in glob.glob(pattern):
+            match = VARIANT_NAME.search(file_path)
+            if match:
+                found.append((int(match.group(1)), os.path.relpath(file_path, upload_folder).replace(os.sep, '/')))
+        return sorted(found)
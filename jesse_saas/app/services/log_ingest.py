@@ -0,0 +1,168 @@
+import atexit
+import os
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.exc import DataError, IntegrityError
+from app.extensions import db
+from app.models import InteractionLog
+from app.services.rollup_service import RollupService
+
+
+class _LogBuffer:
+    """
+    Write-behind queue for InteractionLog rows.
+    A daemon thread bulk-inserts pending rows when the batch size is reached
+    or every flush interval, and whatever is left is drained at exit.
+    A batch that fails max_attempts times is retried row by row, and rows the
+    database rejects are dropped, so one bad row cannot hold up the rest.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.batch_size = 100
+        self.flush_interval = 2.0
+        self.max_pending = 10000
+        self.max_attempts = 3
+        self._rows = []
+        self._failed = [] # [rows, attempts] of batches waiting for a retry
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def configure(self, app):
+        self.app = app
+        self.batch_size = app.config['LOG_BUFFER_BATCH_SIZE']
+        self.flush_interval = app.config['LOG_BUFFER_FLUSH_INTERVAL']
+        self.max_pending = app.config['LOG_BUFFER_MAX_PENDING']
+        self.max_attempts = app.config['LOG_BUFFER_MAX_ATTEMPTS']
+
+    def add(self, row):
+        self._ensure_thread()
+        with self._lock:
+            if self.pending() >= self.max_pending:
+                print("⚠️ Log Buffer full: dropping interaction log row.")
+                return
+            self._rows.append(row)
+            pending = len(self._rows)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def pending(self):
+        return len(self._rows) + sum(len(rows) for rows, _ in self._failed)
+
+    def flush(self):
+        """
+        Inserts every pending batch in one multi-row INSERT and adds it to the
+        daily rollup in the same transaction. Returns the row count written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+                batches, self._failed = self._failed + ([[rows, 0]] if rows else []), []
+            written, retry = 0, []
+            for rows, attempts in batches:
+                try:
+                    self._insert(rows)
+                    written += len(rows)
+                    continue
+                except Exception as e:
+                    attempts += 1
+                    print(f"❌ Log Buffer flush failed ({len(rows)} rows, attempt {attempts}): {e}")
+                if attempts < self.max_attempts:
+                    retry.append([rows, attempts])
+                    continue
+                done, rest = self._insert_each(rows)
+                written += done
+                if rest:
+                    retry.append([rest, attempts])
+            if retry:
+                # Put the batches back for the next flush (add() keeps them within the pending cap)
+                with self._lock:
+                    self._failed = retry + self._failed
+            return written
+
+    def _insert(self, rows):
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(InteractionLog.__table__.insert(), rows)
+                RollupService.apply(conn, rows)
+
+    def _insert_each(self, rows):
+        """Row by row: drops rows the database rejects. Returns (written, rows left for a retry)."""
+        written = 0
+        for i, row in enumerate(rows):
+            try:
+                self._insert([row])
+                written += 1
+            except (IntegrityError, DataError) as e:
+                print(f"❌ Log Buffer dropping interaction log row {row}: {e}")
+            except Exception as e:
+                # Not this row's fault (e.g. the database is down): keep the rest
+                print(f"⚠️ Log Buffer retry deferred ({len(rows) - i} rows): {e}")
+                return written, rows[i:]
+        return written, []
+
+    def _ensure_thread(self):
+        # Threads do not survive a fork (gunicorn --preload), so start per process
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='log-ingest', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+_buffer = _LogBuffer()
+atexit.register(lambda: _buffer.app and _buffer.flush())
+
+
+class LogIngestService:
+    """
+    Records guest interactions without putting a commit on the chat latency path.
+
+    LOG_DURABILITY:
+      'buffered' - queue rows and bulk insert them in the background (default)
+      'sync'     - commit each row inline (serverless, where background threads
+                   are frozen between requests)
+    """
+
+    @staticmethod
+    def init_app(app):
+        _buffer.configure(app)
+
+    @staticmethod
+    def record(client_id, interaction_type, user_query, event_key=None):
+        row = {
+            'client_id': client_id,
+            'interaction_type': interaction_type,
+            'user_query': user_query,
+            'event_key': event_key,
+            'timestamp': datetime.utcnow() # Captured now, not at flush time
+        }
+
+        if current_app.config['LOG_DURABILITY'] == 'sync':
+            db.session.add(InteractionLog(**row))
+            RollupService.apply(db.session, [row])
+            db.session.commit()
+            return
+
+        _buffer.add(row)
+
+    @staticmethod
+    def flush():
+        return _buffer.flush()
+
+    @staticmethod
+    def pending():
+        return _buffer.pending()
@@ -0,0 +1,173 @@
+import math
+import re
+from collections import Counter
+from config import Config
+from app.models import MenuItem
+from app.services.cache_service import TTLCache, CacheService
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Field weights: a hit in the dish name counts more than one in its description
+FIELD_WEIGHTS = (
+    ('name', 3),
+    ('category', 2),
+    ('labels', 2),
+    ('description', 1),
+    ('allergy_info', 1),
+)
+
+# Per-tenant BM25 indexes, keyed by (client_id, content_version)
+_index_cache = CacheService.register(TTLCache(maxsize=Config.MENU_INDEX_CACHE_SIZE))
+
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_RE.findall((text or '').lower()):
+        # Cheap plural folding so "burgers" matches "burger"
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def estimate_tokens(text):
+    """Rough LLM token estimate (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def format_item(item):
+    price = f"${item['price']}" # Assuming generic currency symbol or stored in client setting
+    desc = f": {item['description']}" if item.get('description') else ""
+    return f"- {item['name']} ({price}){desc}"
+
+
+class MenuIndex:
+    """
+    BM25 index over a tenant's available menu items.
+    Items are stored as plain dicts so the index outlives the DB session.
+    The whole-menu prompt text and the category summary are built here too,
+    once per content version, instead of on every question.
+    """
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, items):
+        self.items = items
+        self.doc_freqs = []
+        self.doc_lens = []
+        df = Counter()
+
+        for item in items:
+            terms = []
+            for field, weight in FIELD_WEIGHTS:
+                terms.extend(tokenize(item.get(field)) * weight)
+            freqs = Counter(terms)
+            self.doc_freqs.append(freqs)
+            self.doc_lens.append(len(terms))
+            df.update(freqs.keys())
+
+        n = len(items)
+        self.avg_len = (sum(self.doc_lens) / n) if n else 0
+        self.idf = {
+            term: math.log(1 + (n - freq + 0.5) / (freq + 0.5))
+            for term, freq in df.items()
+        }
+
+        self.full_text = "\n".join(format_item(item) for item in items)
+        self.full_tokens = estimate_tokens(self.full_text)
+        # Category overview so the model knows what else exists
+        self.summary = "Categories: " + ", ".join(
+            f"{cat} ({count} items)" for cat, count in self.categories().items()
+        )
+        self.summary_tokens = estimate_tokens(self.summary)
+
+    def search(self, query, top_k=10):
+        """Returns up to top_k (score, item) pairs with a positive score, best first."""
+        terms = [t for t in set(tokenize(query)) if t in self.idf]
+        if not terms:
+            return []
+
+        scored = []
+        for freqs, doc_len, item in zip(self.doc_freqs, self.doc_lens, self.items):
+            score = 0.0
+            norm = self.K1 * (1 - self.B + self.B * doc_len / (self.avg_len or 1))
+            for term in terms:
+                tf = freqs.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.K1 + 1) / (tf + norm)
+            if score > 0:
+                scored.append((score, item))
+
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return scored[:top_k]
+
+    def categories(self):
+        """Returns {category: item_count} in first-seen order."""
+        counts = Counter()
+        for item in self.items:
+            counts[item.get('category') or 'Other'] += 1
+        return counts
+
+
+class MenuRetriever:
+    @staticmethod
+    def get_index(client_model):
+        """
+        Returns the tenant's MenuIndex, rebuilt only when its content version changes.
+        """
+        key = (client_model.id, client_model.content_version)
+        index = _index_cache.get(key)
+        if index is None:
+            menu_items = MenuItem.query.filter_by(client_id=client_model.id, is_available=True).all()
+            index = MenuIndex([item.to_dict() for item in menu_items])
+            _index_cache.set(key, index)
+        return index
+
+    @staticmethod
+    def build_menu_text(client_model, query=None, top_k=None, token_budget=None):
+        """
+        Builds the MENU ITEMS prompt block for a guest question.
+        Small menus are included whole. Larger ones get a category summary plus
+        the top_k items most relevant to the question, within the token budget.
+        """
+        top_k = top_k or Config.MENU_RETRIEVAL_TOP_K
+        token_budget = token_budget or Config.MENU_CONTEXT_TOKEN_BUDGET
+
+        index = MenuRetriever.get_index(client_model)
+        if not index.items:
+            return "No menu items available."
+
+        if index.full_tokens <= token_budget:
+            return index.full_text
+
+        lines = [index.summary]
+        used = index.summary_tokens
+
+        ranked = [item for _, item in index.search(query or '', top_k=top_k)]
+        if not ranked:
+            # Nothing matched (e.g. "what do you recommend?"): sample across categories
+            ranked = MenuRetriever._round_robin_by_category(index.items)[:top_k]
+
+        for item in ranked:
+            line = format_item(item)
+            cost = estimate_tokens(line)
+            if used + cost > token_budget:
+                break
+            lines.append(line)
+            used += cost
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def _round_robin_by_category(items):
+        buckets = {}
+        for item in items:
+            buckets.setdefault(item.get('category') or 'Other', []).append(item)
+
+        ordered = []
+        queues = list(buckets.values())
+        while queues:
+            for queue in queues:
+                ordered.append(queue.pop(0))
+            queues = [q for q in queues if q]
+        return ordered
@@ -1,6 +1,7 @@
 from app.models import MenuItem
 from app.extensions import db
-from app.services.upload_service import UploadService
+from app.services.upload_pipeline import UploadPipeline
+from app.services.cache_service import CacheService
 
 class MenuService:
     @staticmethod
@@ -37,11 +38,6 @@ class MenuService:
         allergy_info = form_data.get('allergy_info')
         labels = form_data.get('labels') # Comma-separated string
         
-        image_url = None
-        if files and 'image' in files:
-            file = files['image']
-            image_url = UploadService.upload(file, folder='menu', public_id_prefix=f"{client.public_id}")
-        
         item = MenuItem(
             client_id=client.id,
             name=name,
@@ -50,11 +46,15 @@ class MenuService:
             labels=labels,
             category=category,
             description=description,
-            image_url=image_url,
             allergy_info=allergy_info,
             is_available=True
         )
         db.session.add(item)
+
+        if files and 'image' in files:
+            file = files['image']
+            UploadPipeline.submit(file, item, 'image_url', folder='menu', public_id_prefix=f"{client.public_id}")
+        CacheService.bump_version(client)
         db.session.commit()
         return item
 
@@ -105,10 +105,9 @@ class MenuService:
         if files and 'image' in files:
             file = files['image']
             if file.filename != '':
-                url = UploadService.upload(file, folder='menu', public_id_prefix=f"{item.client.public_id}")
-                if url:
-                     item.image_url = url
+                UploadPipeline.submit(file, item, 'image_url', folder='menu', public_id_prefix=f"{item.client.public_id}")
 
+        CacheService.bump_version(item.client)
         db.session.commit()
         return item
 
@@ -119,6 +118,7 @@ class MenuService:
              raise PermissionError("Unauthorized")
         
         item.is_available = not item.is_available
+        CacheService.bump_version(item.client)
         db.session.commit()
         return item.is_available
 
@@ -128,5 +128,6 @@ class MenuService:
         if client_id_check and item.client_id != client_id_check:
              raise PermissionError("Unauthorized")
         
+        CacheService.bump_version(item.client)
         db.session.delete(item)
         db.session.commit()
@@ -0,0 +1,52 @@
+import hashlib
+from flask import Response, request
+from config import Config
+from app.services.cache_service import TTLCache, CacheService
+
+# Rendered public pages, keyed by (client_id, content_version, kind, ...)
+_page_cache = CacheService.register(TTLCache(maxsize=Config.PAGE_CACHE_SIZE))
+
+
+class CachedPage:
+    """A rendered response body with its strong ETag."""
+
+    __slots__ = ('body', 'etag', 'mimetype')
+
+    def __init__(self, body, mimetype):
+        self.body = body.encode('utf-8') if isinstance(body, str) else body
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.mimetype = mimetype
+
+
+class PageCache:
+    """
+    Full-response cache for public tenant pages.
+    Keys carry the tenant's content_version, so an admin edit (CacheService.bump_version)
+    makes the next request render fresh; the ETag is a hash of the rendered body,
+    so browsers and CDNs revalidate with a cheap 304.
+    """
+
+    @staticmethod
+    def get_or_render(key, render, mimetype='text/html'):
+        """Returns the CachedPage for key, calling render() (str or bytes) on a miss."""
+        page = _page_cache.get(key)
+        if page is None:
+            page = CachedPage(render(), mimetype)
+            _page_cache.set(key, page)
+        return page
+
+    @staticmethod
+    def respond(page, max_age=None, stale_while_revalidate=None):
+        """
+        Serves a CachedPage with validators and shared-cache headers, answering
+        If-None-Match with 304 Not Modified.
+        """
+        if max_age is None:
+            max_age = Config.PAGE_MAX_AGE
+        if stale_while_revalidate is None:
+            stale_while_revalidate = Config.PAGE_STALE_WHILE_REVALIDATE
+
+        response = Response(page.body, mimetype=page.mimetype)
+        response.set_etag(page.etag)
+        response.headers['Cache-Control'] = f"public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}"
+        return response.make_conditional(request)
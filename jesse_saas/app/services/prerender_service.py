@@ -0,0 +1,162 @@
+import gzip
+import json
+import os
+import shutil
+from flask import current_app
+from app.models import Client
+from app.services.cache_service import CacheService
+
+MANIFEST = 'manifest.json'
+
+# Output directory of the running app (PRERENDER_DIR), for edit-time invalidation
+_output_dir = None
+
+
+def _paths(entry):
+    """Files and directories owned by one tenant, relative to the output dir."""
+    public_id, slug = entry['public_id'], entry.get('slug')
+    paths = [
+        os.path.join('menu', public_id),
+        os.path.join('chat', public_id),
+        os.path.join('api', 'config', f"{public_id}.json"),
+        os.path.join('api', 'menu', f"{public_id}.json"),
+        os.path.join('api', 'widget', f"{public_id}.js"),
+    ]
+    if slug:
+        paths.append(os.path.join('menu', slug))
+    return paths
+
+
+def _remove(out_dir, entry):
+    for rel in _paths(entry):
+        path = os.path.join(out_dir, rel)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            for variant in (path, path + '.gz', path + '.br'):
+                if os.path.exists(variant):
+                    os.remove(variant)
+
+
+def _drop_prerendered(client):
+    # An edit makes the tenant's static files stale: remove them so nginx falls
+    # back to the app until the next prerender run writes the new version
+    if not _output_dir:
+        return
+    manifest = PrerenderService.load_manifest(_output_dir)
+    entry = manifest.get(str(client.id)) or {'public_id': client.public_id, 'slug': client.slug}
+    _remove(_output_dir, entry)
+
+
+class PrerenderService:
+    """
+    Writes public tenant pages to static files (plus .gz / .br variants) that
+    nginx serves without touching Python:
+
+      menu/<slug>/index.html, menu/<public_id>/index.html
+      chat/<public_id>/index.html, chat/<public_id>/embed.html
+      api/config/<public_id>.json, api/menu/<public_id>.json, api/widget/<public_id>.js
+
+    manifest.json records the content_version each tenant was rendered at, so a
+    run only re-renders tenants that changed.
+    """
+
+    @staticmethod
+    def init_app(app):
+        global _output_dir
+        _output_dir = app.config.get('PRERENDER_DIR')
+        if _output_dir and _drop_prerendered not in CacheService._listeners:
+            CacheService.on_invalidate(_drop_prerendered)
+
+    @staticmethod
+    def load_manifest(out_dir):
+        try:
+            with open(os.path.join(out_dir, MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def write(out_dir, rel_path, body):
+        """Writes body and its precompressed variants atomically (temp file + rename)."""
+        path = os.path.join(out_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        variants = [(path, body), (path + '.gz', gzip.compress(body, 9, mtime=0))]
+        try:
+            import brotli # Optional; nginx needs ngx_brotli to serve the .br files
+        except ImportError:
+            brotli = None
+        if brotli is not None:
+            variants.append((path + '.br', brotli.compress(body)))
+        for target, data in variants:
+            tmp = f"{target}.tmp{os.getpid()}"
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, target)
+
+    @staticmethod
+    def render_client(out_dir, client, http):
+        """Renders one tenant through the real routes. Returns the manifest entry."""
+        pages = [
+            (f"/menu/{client.public_id}", os.path.join('menu', client.public_id, 'index.html')),
+            (f"/chat/{client.public_id}", os.path.join('chat', client.public_id, 'index.html')),
+            (f"/chat/{client.public_id}?mode=embed", os.path.join('chat', client.public_id, 'embed.html')),
+            (f"/api/config/{client.public_id}", os.path.join('api', 'config', f"{client.public_id}.json")),
+            (f"/api/menu/{client.public_id}", os.path.join('api', 'menu', f"{client.public_id}.json")),
+            (f"/api/widget/{client.public_id}.js", os.path.join('api', 'widget', f"{client.public_id}.js")),
+        ]
+        if client.slug:
+            pages.append((f"/menu/{client.slug}", os.path.join('menu', client.slug, 'index.html')))
+
+        base_url = current_app.config['PRERENDER_BASE_URL']
+        for url, rel_path in pages:
+            response = http.get(url, base_url=base_url)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}")
+            PrerenderService.write(out_dir, rel_path, response.get_data())
+
+        return {'version': client.content_version, 'public_id': client.public_id, 'slug': client.slug}
+
+    @staticmethod
+    def run(out_dir, force=False):
+        """
+        Brings out_dir up to date with every active client.
+        Returns (rendered, skipped, removed) tenant counts.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        manifest = PrerenderService.load_manifest(out_dir)
+        http = current_app.test_client()
+        rendered = skipped = removed = 0
+        seen = set()
+
+        for client in Client.query.filter_by(status='active').order_by(Client.id).yield_per(200):
+            key = str(client.id)
+            seen.add(key)
+            entry = manifest.get(key)
+            current = (entry is not None and entry['version'] == client.content_version
+                       and entry.get('slug') == client.slug)
+            if current and not force:
+                skipped += 1
+                continue
+
+            if entry is not None:
+                _remove(out_dir, entry) # Also clears a slug the tenant no longer uses
+            try:
+                manifest[key] = PrerenderService.render_client(out_dir, client, http)
+                rendered += 1
+            except Exception as e:
+                manifest.pop(key, None)
+                print(f"❌ Prerender failed for client {client.id}: {e}")
+
+        # Deactivated or deleted tenants must stop being served
+        for key in [k for k in manifest if k not in seen]:
+            _remove(out_dir, manifest.pop(key))
+            removed += 1
+
+        tmp = os.path.join(out_dir, f"{MANIFEST}.tmp{os.getpid()}")
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp, os.path.join(out_dir, MANIFEST))
+
+        return rendered, skipped, removed
@@ -0,0 +1,64 @@
+import threading
+from urllib.parse import urlsplit
+from config import Config
+
+# Pooled sessions, one per provider origin (scheme://host:port)
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class ProviderClient:
+    """
+    HTTP layer for LLM providers.
+    Reuses keep-alive connections per base URL so chat messages skip the
+    TCP+TLS handshake, and applies per-provider (connect, read) timeouts.
+    Base URLs come from config, so any provider can point at a local mock server.
+    """
+
+    @staticmethod
+    def base_url(provider):
+        """Returns the API base URL for a provider (env overridable)."""
+        return Config.LLM_BASE_URLS.get(provider) or Config.LLM_BASE_URLS['groq']
+
+    @staticmethod
+    def timeout(provider):
+        """Returns the (connect, read) timeout tuple for a provider."""
+        return Config.LLM_TIMEOUTS.get(provider) or Config.LLM_TIMEOUTS['openai_compatible']
+
+    @staticmethod
+    def session_for(url):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+
+        session = _sessions.get(origin)
+        if session is None:
+            with _sessions_lock:
+                session = _sessions.get(origin)
+                if session is None:
+                    # Imported on first provider call: workers that never reach an
+                    # LLM (buttons, menus, cached answers) skip loading requests
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=Config.LLM_POOL_CONNECTIONS,
+                        pool_maxsize=Config.LLM_POOL_MAXSIZE,
+                        max_retries=0 # Retries are the caller's decision (non-idempotent POSTs)
+                    )
+                    session.mount(f"{parts.scheme}://", adapter)
+                    _sessions[origin] = session
+        return session
+
+    @staticmethod
+    def post(provider, url, **kwargs):
+        """POSTs through the pooled session for the URL's origin."""
+        kwargs.setdefault('timeout', ProviderClient.timeout(provider))
+        return ProviderClient.session_for(url).post(url, **kwargs)
+
+    @staticmethod
+    def close_all():
+        with _sessions_lock:
+            for session in _sessions.values():
+                session.close()
+            _sessions.clear()
@@ -0,0 +1,124 @@
+from collections import Counter
+from datetime import date, datetime
+from sqlalchemy import func
+from app.extensions import db
+from app.models import InteractionLog, InteractionDailyRollup
+from app.services.event_classifier import EventClassifier
+
+
+class RollupService:
+    """
+    Maintains interaction_daily_rollup: one counter per (client, UTC day, type, event),
+    where event is the click's event_key.
+    """
+
+    @staticmethod
+    def event_for(interaction_type, user_query):
+        """Buckets a button click by its starter intent (event_key); AI chat is a single bucket."""
+        if interaction_type != 'button_click':
+            return ''
+        return EventClassifier.classify(user_query)
+
+    @staticmethod
+    def aggregate(rows):
+        """
+        Folds log rows (dicts with client_id, interaction_type, user_query, timestamp)
+        into {(client_id, date, interaction_type, event): count}.
+        """
+        buckets = Counter()
+        for row in rows:
+            day = row['timestamp'].date()
+            event = RollupService.event_for(row['interaction_type'], row['user_query'])
+            buckets[(row['client_id'], day, row['interaction_type'], event)] += 1
+        return buckets
+
+    @staticmethod
+    def apply(conn, rows):
+        """
+        Adds the rows' counts to the rollup inside the caller's transaction.
+        conn is a Connection or Session.
+        """
+        buckets = RollupService.aggregate(rows)
+        if buckets:
+            RollupService._upsert(conn, buckets)
+
+    @staticmethod
+    def _upsert(conn, buckets):
+        table = InteractionDailyRollup.__table__
+        values = [
+            {'client_id': c, 'date': d, 'interaction_type': t, 'event': e, 'count': n}
+            for (c, d, t, e), n in buckets.items()
+        ]
+
+        # Connection exposes .dialect; Session resolves it through its bind
+        dialect = (getattr(conn, 'dialect', None) or conn.get_bind().dialect).name
+        if dialect in ('postgresql', 'sqlite'):
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            # Chunked to stay under the bound-parameter limits
+            for start in range(0, len(values), 1000):
+                stmt = insert(table).values(values[start:start + 1000])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['client_id', 'date', 'interaction_type', 'event'],
+                    set_={'count': table.c.count + stmt.excluded.count}
+                )
+                conn.execute(stmt)
+            return
+
+        # Generic fallback: update, then insert missing buckets
+        for value in values:
+            result = conn.execute(
+                table.update()
+                .where(table.c.client_id == value['client_id'],
+                       table.c.date == value['date'],
+                       table.c.interaction_type == value['interaction_type'],
+                       table.c.event == value['event'])
+                .values(count=table.c.count + value['count'])
+            )
+            if result.rowcount == 0:
+                conn.execute(table.insert().values(**value))
+
+    @staticmethod
+    def backfill(client_id=None, since=None):
+        """
+        Rebuilds rollup rows from interaction_logs (all history, or from `since` on).
+        Logs are pre-grouped in SQL by day and label, so only distinct buckets
+        cross the wire. Returns the number of rollup rows written.
+        """
+        table = InteractionDailyRollup.__table__
+        day = func.date(InteractionLog.timestamp)
+
+        delete = table.delete()
+        query = db.session.query(
+            InteractionLog.client_id,
+            day.label('day'),
+            InteractionLog.interaction_type,
+            InteractionLog.user_query,
+            func.count(InteractionLog.id)
+        )
+        if client_id is not None:
+            delete = delete.where(table.c.client_id == client_id)
+            query = query.filter(InteractionLog.client_id == client_id)
+        if since is not None:
+            delete = delete.where(table.c.date >= since)
+            query = query.filter(InteractionLog.timestamp >= datetime.combine(since, datetime.min.time()))
+        query = query.group_by(
+            InteractionLog.client_id, day, InteractionLog.interaction_type, InteractionLog.user_query
+        )
+
+        buckets = Counter()
+        for cid, log_day, interaction_type, user_query, count in query.yield_per(5000):
+            if log_day is None:
+                continue
+            if isinstance(log_day, str): # SQLite returns date() as text
+                log_day = date.fromisoformat(log_day)
+            event = RollupService.event_for(interaction_type, user_query)
+            buckets[(cid, log_day, interaction_type, event)] += count
+
+        db.session.execute(delete)
+        if buckets:
+            RollupService._upsert(db.session, buckets)
+        db.session.commit()
+        return len(buckets)
@@ -0,0 +1,78 @@
+from config import Config
+from app.models import Client
+from app.services.cache_service import TTLCache, CacheService
+
+
+class Snapshot:
+    """
+    Read-only copy of a model row's column values.
+    Safe to share between requests and threads; never attached to a DB session.
+    """
+
+    def __init__(self, row, **extra):
+        values = {column.key: getattr(row, column.key) for column in row.__table__.columns}
+        values.update(extra)
+        self.__dict__.update(values)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self):
+        return f"<Snapshot {getattr(self, 'id', None)}>"
+
+
+# Tenant snapshots, keyed by ('public_id' | 'slug', value)
+_tenant_cache = CacheService.register(TTLCache(maxsize=Config.TENANT_CACHE_SIZE, ttl=Config.TENANT_CACHE_TTL))
+
+
+@CacheService.on_invalidate
+def _drop_tenant(client):
+    # Drops every key pointing at the client, including a slug it no longer uses
+    _tenant_cache.delete_values_where(lambda snapshot: snapshot.id == client.id)
+
+
+class TenantCache:
+    """
+    Resolves public_id / slug to a read-only Client + KnowledgeBase snapshot.
+    Public routes (widget config, chat, menu) call this on every page view.
+    Admin writes invalidate through CacheService.bump_version; other workers
+    pick up the change within TENANT_CACHE_TTL seconds.
+    """
+
+    @staticmethod
+    def snapshot(client):
+        kb = client.knowledge_base
+        return Snapshot(client, knowledge_base=Snapshot(kb) if kb else None)
+
+    @staticmethod
+    def _lookup(kind, value):
+        key = (kind, value)
+        snap = _tenant_cache.get(key)
+        if snap is None:
+            client = Client.query.filter_by(**{kind: value}).first()
+            if not client:
+                return None
+            snap = TenantCache.snapshot(client)
+            _tenant_cache.set(key, snap)
+        return snap
+
+    @staticmethod
+    def by_public_id(public_id):
+        if not public_id:
+            return None
+        return TenantCache._lookup('public_id', public_id)
+
+    @staticmethod
+    def resolve(ref):
+        """Looks up by public_id first, then falls back to slug."""
+        if not ref:
+            return None
+        # Slug links would otherwise pay a public_id miss query on every view
+        snap = _tenant_cache.get(('public_id', ref)) or _tenant_cache.get(('slug', ref))
+        if snap is not None:
+            return snap
+        return TenantCache._lookup('public_id', ref) or TenantCache._lookup('slug', ref)
+
+    @staticmethod
+    def invalidate(client):
+        _drop_tenant(client)
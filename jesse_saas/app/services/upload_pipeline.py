@@ -0,0 +1,260 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event, select, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import Client, UploadAsset, UploadAssetRef
+from app.services.cache_service import CacheService
+from app.services.upload_service import UploadService
+
+
+class LocalBackend:
+    """Keeps the staged file where it is (dev, self-hosted behind nginx, tests)."""
+
+    def push(self, staged_path, folder, public_id_prefix):
+        from app.services.image_service import ImageService
+        ImageService.create_variants(staged_path)
+        return staged_path
+
+
+class CloudinaryBackend:
+    """Pushes the staged file to Cloudinary and removes the local copy."""
+
+    def push(self, staged_path, folder, public_id_prefix):
+        local_path = os.path.join(current_app.config['UPLOAD_FOLDER'], staged_path)
+        url = UploadService.push_cloudinary(local_path, staged_path.rsplit('.', 1)[0]) # "folder/<sha256>"
+        os.remove(local_path)
+        return url
+
+
+class _Workers:
+    """Thread pool for backend pushes, started per process (threads do not survive a fork)."""
+
+    def __init__(self):
+        self.app = None
+        self.backend = None # Set by UploadPipeline.set_backend; otherwise from UPLOAD_BACKEND
+        self._executor = None
+        self._pid = None
+        self._futures = set()
+        self._lock = threading.Lock()
+
+    def submit(self, asset_id):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.app.config['UPLOAD_WORKERS'], thread_name_prefix='upload'
+                )
+                self._futures = set()
+            future = self._executor.submit(UploadPipeline.process, self.app, asset_id)
+            self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+
+    def drain(self):
+        for future in list(self._futures):
+            future.result()
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=True)
+
+
+_workers = _Workers()
+atexit.register(_workers.shutdown)
+
+
+def _queue_after_commit(session):
+    # Workers must only see assets (and their targets) once they are committed
+    for asset_id in session.info.pop('upload_assets', []):
+        _workers.submit(asset_id)
+
+
+def _discard_after_rollback(session):
+    session.info.pop('upload_assets', None)
+
+
+class UploadPipeline:
+    """
+    Uploads for model fields without a remote round trip in the admin request.
+
+    submit() hashes the file while staging it locally. Bytes seen before reuse
+    their UploadAsset: a pushed one gives its URL straight away, with no disk
+    write or transfer. New bytes get a pending asset; the field points at the
+    staged path (served by /uploads right away) and, once the request commits,
+    a worker pushes the file to the backend and patches every field referencing
+    the asset with the final URL, unless a field was changed again meanwhile.
+
+    UPLOAD_MODE:
+      'async' - push in the worker pool (default)
+      'sync'  - push inline (serverless, where background threads are frozen
+                between requests)
+    """
+
+    @staticmethod
+    def init_app(app):
+        _workers.app = app
+        if not event.contains(db.session, 'after_commit', _queue_after_commit):
+            event.listen(db.session, 'after_commit', _queue_after_commit)
+            event.listen(db.session, 'after_rollback', _discard_after_rollback)
+
+    @staticmethod
+    def set_backend(backend):
+        """Swaps the storage backend (None: back to UPLOAD_BACKEND)."""
+        _workers.backend = backend
+
+    @staticmethod
+    def backend():
+        if _workers.backend is not None:
+            return _workers.backend
+        name = current_app.config['UPLOAD_BACKEND']
+        if name == 'auto':
+            name = 'cloudinary' if UploadService._is_cloudinary_configured() else 'local'
+        return CloudinaryBackend() if name == 'cloudinary' else LocalBackend()
+
+    @staticmethod
+    def submit(file, target, field, folder, public_id_prefix=''):
+        """
+        Accepts an upload for target.<field>. Returns the UploadAsset (pending in
+        async mode unless the bytes were pushed before), or None when the file is
+        missing, invalid or cannot be staged. The caller commits as usual.
+        """
+        if not UploadService.validate(file):
+            return None
+        temp_path, content_hash, ext = UploadService.receive(file)
+        if not temp_path:
+            return None
+
+        asset = UploadPipeline._asset_for(content_hash, UploadService.content_path(folder, content_hash, ext),
+                                          folder, public_id_prefix)
+        if asset.status == 'done':
+            os.remove(temp_path)
+        else:
+            UploadService.store(temp_path, asset.staged_path) # No rewrite if already staged
+            if asset.status == 'failed':
+                asset.status, asset.error = 'pending', None # Retry the push
+
+        setattr(target, field, asset.url if asset.status == 'done' else asset.staged_path)
+        db.session.add(target)
+        db.session.flush() # Ids for the reference and the worker
+        UploadPipeline._reference(asset, target, field)
+
+        if asset.status != 'pending':
+            return asset
+        if current_app.config['UPLOAD_MODE'] == 'sync':
+            UploadPipeline._push(asset)
+            if asset.status == 'done':
+                setattr(target, field, asset.url)
+            return asset
+
+        queued = db.session.info.setdefault('upload_assets', [])
+        if asset.id not in queued:
+            queued.append(asset.id)
+        return asset
+
+    @staticmethod
+    def _asset_for(content_hash, staged_path, folder, public_id_prefix):
+        asset = UploadAsset.query.filter_by(content_hash=content_hash).first()
+        if asset is not None:
+            return asset
+
+        asset = UploadAsset(content_hash=content_hash, staged_path=staged_path, folder=folder,
+                            public_id_prefix=public_id_prefix, status='pending')
+        try:
+            with db.session.begin_nested():
+                db.session.add(asset)
+        except IntegrityError:
+            # Same bytes uploaded concurrently by another request
+            asset = UploadAsset.query.filter_by(content_hash=content_hash).one()
+        return asset
+
+    @staticmethod
+    def _reference(asset, target, field):
+        ref = UploadAssetRef.query.filter_by(
+            target_table=target.__tablename__, target_id=target.id, target_field=field
+        ).first()
+        if ref is None:
+            ref = UploadAssetRef(target_table=target.__tablename__, target_id=target.id, target_field=field)
+            db.session.add(ref)
+        ref.asset_id = asset.id
+
+    @staticmethod
+    def process(app, asset_id):
+        """Worker entry point: pushes one pending asset and patches the fields referencing it."""
+        with app.app_context():
+            try:
+                asset = db.session.get(UploadAsset, asset_id)
+                if asset is None:
+                    return
+                if asset.status == 'pending':
+                    UploadPipeline._push(asset)
+                # Also for done assets: a field may have referenced it while it was being pushed
+                if asset.status == 'done':
+                    UploadPipeline._patch_targets(asset)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Upload worker failed for asset {asset_id}: {e}")
+            finally:
+                db.session.remove()
+
+    @staticmethod
+    def process_pending():
+        """Pushes assets left pending (e.g. by a restart) inline. Returns how many were processed."""
+        ids = db.session.scalars(select(UploadAsset.id).where(UploadAsset.status == 'pending')).all()
+        for asset_id in ids:
+            UploadPipeline.process(current_app._get_current_object(), asset_id)
+        return len(ids)
+
+    @staticmethod
+    def drain():
+        """Blocks until every queued push has finished (tests, CLI)."""
+        _workers.drain()
+
+    @staticmethod
+    def _push(asset):
+        try:
+            asset.url = UploadPipeline.backend().push(asset.staged_path, asset.folder, asset.public_id_prefix)
+            asset.status = 'done'
+        except Exception as e:
+            asset.status = 'failed'
+            asset.error = str(e)
+            print(f"⚠️ Upload push failed for {asset.staged_path}, keeping the local copy: {e}")
+        asset.completed_at = datetime.utcnow()
+
+    @staticmethod
+    def _owner_column(table):
+        """Column holding the owning client's id: clients.id itself, else client_id (None if neither)."""
+        if table.name == Client.__tablename__:
+            return table.c.id
+        return table.c.get('client_id')
+
+    @staticmethod
+    def _patch_targets(asset):
+        client_ids = set()
+        for ref in asset.refs:
+            table = db.metadata.tables[ref.target_table]
+            column = table.c[ref.target_field]
+            owner_column = UploadPipeline._owner_column(table)
+            owner = db.session.execute(
+                select(owner_column if owner_column is not None else table.c.id)
+                .where(table.c.id == ref.target_id, column == asset.staged_path)
+            ).first()
+            if owner is None:
+                continue # Target deleted or given another image since
+
+            if asset.url != asset.staged_path:
+                db.session.execute(
+                    update(table).where(table.c.id == ref.target_id, column == asset.staged_path).values({column: asset.url})
+                )
+            if owner_column is not None:
+                client_ids.add(owner[0])
+
+        # New URL (or new local variants): cached pages must re-render
+        for client_id in client_ids:
+            client = db.session.get(Client, client_id)
+            if client:
+                CacheService.bump_version(client)
@@ -1,12 +1,46 @@
 import os
-import cloudinary
-import cloudinary.uploader
 import re
-from flask import current_app, url_for
-from werkzeug.utils import secure_filename
-from datetime import datetime
+import hashlib
+import tempfile
+import mimetypes
+from functools import lru_cache
+from urllib.parse import quote
+from flask import current_app, url_for, request, has_request_context, Response, abort, send_from_directory
+from werkzeug.security import safe_join
+from config import Config
+from app.services.cache_service import TTLCache, CacheService
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'avif'}
+INCOMING_DIR = '.incoming' # Under UPLOAD_FOLDER, so stored files are a rename away
+CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of the accepted image formats -> stored extension
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+
+# Resolved image URLs and srcsets, keyed by (kind, script_root, path, width/format)
+_resolved = CacheService.register(TTLCache(maxsize=Config.RESOLVE_CACHE_SIZE))
+
+CLOUDINARY_UPLOAD = re.compile(r'/upload/')
+
+# Names that never change content: "<sha256>[.w<width>].<ext>" and legacy "<prefix>_<timestamp>_<name>"
+IMMUTABLE_NAME = re.compile(r'(^|/)([0-9a-f]{64}(\.w\d+)?\.\w+|[^/]*_\d{9,}\.\d+_[^/]+)$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+@lru_cache(maxsize=64)
+def cloudinary_transform(width=None):
+    # Default transformations: Auto format (WebP/AVIF), Auto Quality
+    transforms = ['f_auto', 'q_auto']
+    if width:
+        transforms.append(f'w_{width}')
+        transforms.append('c_limit') # Resize but maintain aspect ratio (don't crop)
+    return ','.join(transforms)
+
 
 class UploadService:
     @staticmethod
@@ -19,11 +53,16 @@ class UploadService:
 
     @staticmethod
     def _init_cloudinary():
+        # Imported on first upload only: the SDK is heavy and public routes never need it
+        import cloudinary
+        import cloudinary.uploader
+
         cloudinary.config(
             cloud_name=current_app.config['CLOUDINARY_CLOUD_NAME'],
             api_key=current_app.config['CLOUDINARY_API_KEY'],
             api_secret=current_app.config['CLOUDINARY_API_SECRET']
         )
+        return cloudinary
     
     @staticmethod
     def allowed_file(filename):
@@ -31,64 +70,188 @@ class UploadService:
                filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
     @staticmethod
-    def upload(file, folder='uploads', public_id_prefix=''):
+    def upload(file, folder='uploads'):
         """
         Uploads a file to Cloudinary or falls back to local storage.
         Returns the public URL (or local path fallback) of the uploaded file.
         Enforces image validation.
+        Blocks on the remote transfer; model fields should go through
+        UploadPipeline.submit, which pushes in the background.
         """
-        if not file or file.filename == '':
+        if not UploadService.validate(file):
             return None
 
-        if not UploadService.allowed_file(file.filename):
-            print(f"Security: Blocked upload of {file.filename} (Invalid Extension)")
+        temp_path, content_hash, ext = UploadService.receive(file)
+        if not temp_path:
             return None
 
-        # Prepare filename
-        filename = secure_filename(file.filename)
+        # Identical bytes already pushed: reuse them, no write or transfer
+        from app.models import UploadAsset
+        known = UploadAsset.query.filter_by(content_hash=content_hash, status='done').first()
+        if known:
+            os.remove(temp_path)
+            return known.url
         
         # 1. Cloudinary Upload (If Configured)
         if UploadService._is_cloudinary_configured():
             try:
-                UploadService._init_cloudinary()
-                
-                # Cloudinary allows organizing by folders and adding a prefix
-                # We use timestamp to ensure uniqueness just in case
-                public_id = f"{folder}/{public_id_prefix}_{datetime.now().timestamp()}_{filename.split('.')[0]}"
-                
-                # Direct Upload
-                response = cloudinary.uploader.upload(
-                    file,
-                    public_id=public_id,
-                    resource_type="image" # Force image type for security
-                )
-                
-                # Return SSL URL
-                return response.get('secure_url')
-                
+                url = UploadService.push_cloudinary(temp_path, f"{folder}/{content_hash}")
+                os.remove(temp_path)
+                return url
             except Exception as e:
                 print(f"Cloudinary Upload Error: {e}")
                 # Fallback to local? Or fail? 
                 pass
 
         # 2. Local Fallback (Dev / No Cloudinary)
+        path = UploadService.content_path(folder, content_hash, ext)
+        if UploadService.store(temp_path, path):
+            # Responsive WebP/AVIF widths for srcset (Cloudinary does this on the fly)
+            from app.services.image_service import ImageService
+            ImageService.create_variants(path)
+        return path
+
+    @staticmethod
+    def validate(file):
+        """True when a file was sent and has an allowed image extension."""
+        if not file or file.filename == '':
+            return False
+
+        if not UploadService.allowed_file(file.filename):
+            print(f"Security: Blocked upload of {file.filename} (Invalid Extension)")
+            return False
+        return True
+
+    @staticmethod
+    def sniff(head):
+        """Image format from the first bytes of a file ('jpg', 'png', ...), or None if not an image."""
+        for signature, ext in IMAGE_SIGNATURES:
+            if head.startswith(signature):
+                return ext
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            return 'webp'
+        if head[4:8] == b'ftyp' and head[8:12] in (b'avif', b'avis'):
+            return 'avif'
+        return None
+
+    @staticmethod
+    def receive(file):
+        """
+        Streams the upload into UPLOAD_FOLDER/.incoming, hashing it on the way.
+        Rejects files over UPLOAD_MAX_BYTES and anything that is not an image by
+        its leading bytes (the extension alone proves nothing), then downscales
+        past UPLOAD_MAX_DIMENSION before anything is stored or transferred.
+        Returns (temp_path, sha256 hex, ext), or (None, None, None) if rejected.
+        """
+        max_bytes = current_app.config['UPLOAD_MAX_BYTES']
+        temp_path = None
         try:
-            upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], folder)
-            os.makedirs(upload_dir, exist_ok=True)
-            
-            # Timestamp to avoid collisions
-            saved_filename = f"{public_id_prefix}_{datetime.now().timestamp()}_{filename}"
-            file_path = os.path.join(upload_dir, saved_filename)
-            
-            # Reset file pointer if it was read by Cloudinary attempt
+            incoming = os.path.join(current_app.config['UPLOAD_FOLDER'], INCOMING_DIR)
+            os.makedirs(incoming, exist_ok=True)
+            digest = hashlib.sha256()
+            size = 0
+
             file.seek(0)
-            file.save(file_path)
-            
-            return f"{folder}/{saved_filename}" # We'll need to adjust how this is served.
-            
+            head = file.read(CHUNK_SIZE)
+            ext = UploadService.sniff(head)
+            if ext is None:
+                print(f"Security: Blocked upload of {file.filename} (Not an image)")
+                return None, None, None
+
+            fd, temp_path = tempfile.mkstemp(dir=incoming)
+            with os.fdopen(fd, 'wb') as out:
+                chunk = head
+                while chunk:
+                    size += len(chunk)
+                    if size > max_bytes:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+                    chunk = file.read(CHUNK_SIZE)
+            if size > max_bytes:
+                os.remove(temp_path)
+                print(f"Security: Blocked upload of {file.filename} (Over {max_bytes} bytes)")
+                return None, None, None
+
+            from app.services.image_service import ImageService
+            if ImageService.downscale(temp_path, current_app.config['UPLOAD_MAX_DIMENSION']):
+                digest = hashlib.sha256()
+                with open(temp_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+            return temp_path, digest.hexdigest(), ext
+
         except Exception as e:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
             print(f"Local Upload Error: {e}")
-            return None
+            return None, None, None
+
+    @staticmethod
+    def content_path(folder, content_hash, ext):
+        """Content address of an upload: "folder/<sha256>.<ext>"."""
+        return f"{folder}/{content_hash}.{ext}"
+
+    @staticmethod
+    def store(temp_path, path):
+        """
+        Moves a received file to its path under UPLOAD_FOLDER. Returns False (and
+        drops the temp file) when identical bytes are already stored there.
+        """
+        target = os.path.join(current_app.config['UPLOAD_FOLDER'], path)
+        if os.path.exists(target):
+            os.remove(temp_path)
+            return False
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(temp_path, target)
+        return True
+
+    @staticmethod
+    def push_cloudinary(source, public_id):
+        """Uploads a file object or local path to Cloudinary. Returns the SSL URL; raises on failure."""
+        cloudinary = UploadService._init_cloudinary()
+        
+        # Direct Upload (public_id is the content address, so a repeat never overwrites)
+        response = cloudinary.uploader.upload(
+            source,
+            public_id=public_id,
+            overwrite=False,
+            resource_type="image" # Force image type for security
+        )
+        
+        # Return SSL URL
+        url = response.get('secure_url')
+        if not url:
+            raise RuntimeError(f"Cloudinary returned no URL for {public_id}")
+        return url
+
+    @staticmethod
+    def serve(upload_folder, filename):
+        """
+        Response for /uploads/<filename>. The app only checks the path (inside
+        UPLOAD_FOLDER, no hidden staging dirs, an existing file); per UPLOAD_SERVE_MODE:
+          'app'      - send the file from this worker (dev default)
+          'x-accel'  - X-Accel-Redirect to UPLOAD_ACCEL_PREFIX, an internal nginx location
+          'sendfile' - X-Sendfile with the absolute path (Apache mod_xsendfile, lighttpd)
+        Content-addressed and timestamped names are cached as immutable.
+        """
+        path = safe_join(upload_folder, filename)
+        if path is None or any(part.startswith('.') for part in filename.split('/')) or not os.path.isfile(path):
+            abort(404)
+
+        mode = current_app.config['UPLOAD_SERVE_MODE']
+        if mode == 'x-accel':
+            response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+            response.headers['X-Accel-Redirect'] = current_app.config['UPLOAD_ACCEL_PREFIX'].rstrip('/') + '/' + quote(filename)
+        elif mode == 'sendfile':
+            response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+            response.headers['X-Sendfile'] = os.path.abspath(path)
+        else:
+            response = send_from_directory(upload_folder, filename)
+
+        if IMMUTABLE_NAME.search(filename):
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
 
     @staticmethod
     def is_remote_url(path):
@@ -102,24 +265,25 @@ class UploadService:
         Generates the final URL for an image, handling both Cloudinary transforms
         and local standard routes.
         This replaces the complex logic in __init__.py.
+        Memoized per (path, width): templates call it for every image on a page.
         """
         if not filename: return None
 
+        key = ('url', request.script_root if has_request_context() else '', filename, width)
+        url = _resolved.get(key)
+        if url is None:
+            url = UploadService._resolve_url(filename, width)
+            _resolved.set(key, url)
+        return url
+
+    @staticmethod
+    def _resolve_url(filename, width):
         # Remote / Cloudinary
         if UploadService.is_remote_url(filename):
             # Optimize Cloudinary URLs
             if 'cloudinary.com' in filename and '/upload/' in filename:
-                # Default transformations: Auto format (WebP/AVIF), Auto Quality
-                transforms = ['f_auto', 'q_auto']
-                
-                if width:
-                    transforms.append(f'w_{width}')
-                    transforms.append('c_limit') # Resize but maintain aspect ratio (don't crop)
-                
-                transform_str = ','.join(transforms)
-                
                 # Inject transformations after /upload/
-                return re.sub(r'(/upload/)', f'\\1{transform_str}/', filename, count=1)
+                return CLOUDINARY_UPLOAD.sub(f"/upload/{cloudinary_transform(width)}/", filename, count=1)
             
             return filename
 
@@ -127,3 +291,49 @@ class UploadService:
         # Assuming filename is "folder/file.ext"
         return url_for('uploaded_file', filename=filename)
 
+    @staticmethod
+    def resolve_srcset(filename, fmt=None):
+        """
+        srcset value ("<url> 320w, <url> 640w, ...") for an image, or '' when there is
+        nothing better than the plain src.
+        fmt=None: Cloudinary widths with automatic format (for the <img> itself).
+        fmt='webp'/'avif': the local variants in that format (for <source type=...>).
+        Memoized like resolve_url; local results expire after RESOLVE_SRCSET_TTL
+        since the upload workers add variants after the fact.
+        """
+        if not filename: return ''
+
+        key = ('srcset', request.script_root if has_request_context() else '', filename, fmt)
+        srcset = _resolved.get(key)
+        if srcset is not None:
+            return srcset
+
+        if UploadService.is_remote_url(filename):
+            srcset = ''
+            if not fmt and 'cloudinary.com' in filename and '/upload/' in filename:
+                widths = current_app.config['IMAGE_VARIANT_WIDTHS']
+                srcset = ', '.join(f"{UploadService.resolve_url(filename, width=width)} {width}w" for width in widths)
+            _resolved.set(key, srcset)
+            return srcset
+
+        if not fmt:
+            return ''
+        from app.services.image_service import ImageService
+        srcset = ', '.join(
+            f"{url_for('uploaded_file', filename=variant)} {width}w"
+            for width, variant in ImageService.variants(filename, fmt)
+        )
+        if srcset: # No variants yet may just mean the worker has not run
+            _resolved.set(key, srcset, ttl=current_app.config['RESOLVE_SRCSET_TTL'])
+        return srcset
+
+    @staticmethod
+    def resolve_item(item):
+        """
+        Adds the resolved image URLs to a menu item dict (MenuItem.to_dict()),
+        so cached menus carry them instead of resolving on every use.
+        """
+        image = item.get('image_url')
+        item['image_src'] = UploadService.resolve_url(image)
+        item['image_srcset'] = UploadService.resolve_srcset(image) or UploadService.resolve_srcset(image, 'webp')
+        return item
@@ -385,7 +385,9 @@ function handleAction(arg1, arg2, arg3) {
     if (btnData.action === 'menu') {
         appendMessage(btnData.label, 'user');
         showTypingIndicator();
-        setTimeout(() => {
+        // Menu items load separately from the page shell (MENU_READY); wait if still in flight
+        const menuReady = typeof MENU_READY !== 'undefined' ? MENU_READY : Promise.resolve();
+        setTimeout(() => menuReady.then(() => {
             hideTypingIndicator();
             if (typeof MENU_DATA === 'undefined' || MENU_DATA.length === 0) {
                 appendMessage("Sorry, the menu is currently not available.", 'bot');
@@ -421,7 +423,7 @@ function handleAction(arg1, arg2, arg3) {
 
             renderInlineButtons(catButtons, btnContainer);
             scrollToBottom();
-        }, 600);
+        }), 600);
         return;
     }
 
@@ -491,7 +493,7 @@ function handleAction(arg1, arg2, arg3) {
                 <div class="flex items-end gap-2 mb-1">
                     ${avatar}
                     <div class="px-4 py-3 rounded-2xl rounded-tl-none shadow-sm text-sm border transition-colors duration-300 max-w-[85%] bg-white border-gray-200">
-                        ${item.image_url ? `<img src="/static/uploads/menu/${item.image_url}" class="w-full h-32 object-cover rounded-md mb-2">` : ''}
+                        ${item.image_src ? `<img src="${item.image_src}" ${item.image_srcset ? `srcset="${item.image_srcset}" sizes="320px"` : ''} class="w-full h-32 object-cover rounded-md mb-2">` : ''}
                         <h3 class="font-bold text-gray-800 text-lg">${item.name}</h3>
                         <p class="text-blue-600 font-semibold mb-1">${currency}${item.price}</p>
                         <p class="text-gray-600 text-xs mb-2">${item.description || 'No description available.'}</p>
@@ -640,21 +642,22 @@ function handleUserSubmit(e) {
         message: text
     };
 
-    fetch('/api/chat', {
+    fetch('/api/chat/stream', {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json'
         },
         body: JSON.stringify(payload)
     })
-        .then(response => response.json())
-        .then(data => {
-            hideTypingIndicator();
-            if (data.error) {
-                appendMessage("⚠️ " + (data.message || "An error occurred."), 'bot'); // Show error gracefully
-            } else {
-                appendMessage(data.response, 'bot');
+        .then(response => {
+            // Errors (tier/validation) come back as plain JSON
+            if (!response.ok || !response.body) {
+                return response.json().then(data => {
+                    hideTypingIndicator();
+                    appendMessage("⚠️ " + (data.message || data.error || "An error occurred."), 'bot');
+                });
             }
+            return readChatStream(response);
         })
         .catch(error => {
             hideTypingIndicator();
@@ -662,3 +665,62 @@ function handleUserSubmit(e) {
             appendMessage("I'm having trouble connecting to the server. Please try again.", 'bot');
         });
 }
+
+// Renders an SSE reply from /api/chat/stream token by token.
+// The final 'done' event re-renders the full text through appendMessage (smart buttons, links).
+async function readChatStream(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let fullText = '';
+    let liveDiv = null;
+
+    const renderLive = () => {
+        if (!liveDiv) {
+            hideTypingIndicator();
+            liveDiv = appendMessage('', 'bot');
+        }
+        // Hide half-streamed [BUTTON:...] markers until the final render
+        const visible = fullText.replace(/\[BUTTON:[^\]]*\]?/g, '');
+        const bubble = liveDiv.querySelector('.whitespace-pre-line');
+        if (bubble) bubble.innerHTML = linkify(visible);
+        scrollToBottom();
+    };
+
+    const finish = (text) => {
+        hideTypingIndicator();
+        if (liveDiv) liveDiv.remove();
+        appendMessage(text, 'bot');
+    };
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let eventName = 'message';
+            let data = '';
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            if (!data) continue;
+
+            const parsed = JSON.parse(data);
+            if (eventName === 'token') {
+                fullText += parsed.text;
+                renderLive();
+            } else if (eventName === 'done') {
+                finish(parsed.response);
+                return;
+            }
+        }
+    }
+    // Stream closed without a 'done' event
+    finish(fullText || "I'm having trouble connecting to the server. Please try again.");
+}
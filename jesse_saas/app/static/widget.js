@@ -1,16 +1,24 @@
 (function () {
+    // Served as /api/widget/<public_id>.js, this holds the tenant config (no config request)
+    const INLINE_BOOT = null;
+
     // 1. Initialization
     const scriptTag = document.currentScript || document.querySelector('script[data-id]');
     if (!scriptTag) {
         console.error("JESSE Widget: Could not find script tag with data-id attribute.");
         return;
     }
-    const PUBLIC_ID = scriptTag.getAttribute('data-id');
+    const PUBLIC_ID = scriptTag.getAttribute('data-id') || (INLINE_BOOT && INLINE_BOOT.public_id);
     const MODE = scriptTag.getAttribute('data-mode') || 'widget'; // 'widget' or 'fullscreen'
-    // Remove 'static/widget.js' to get base URL (e.g. http://localhost:5000)
-    const API_BASE = scriptTag.src.replace(/\/static\/widget\.js$/, '');
+    // Remove 'static/widget.js' or 'api/widget/<id>.js' to get base URL (e.g. http://localhost:5000)
+    const API_BASE = scriptTag.src.replace(/\/(static\/widget|api\/widget\/[^\/?#]+)\.js([?#].*)?$/, '');
+
+    if (INLINE_BOOT) {
+        initWidget(INLINE_BOOT.config);
+        return;
+    }
 
-    // 2. Fetch Configuration
+    // 2. Fetch Configuration (revalidated with ETag; a 304 comes from the browser cache)
     fetch(`${API_BASE}/api/config/${PUBLIC_ID}`)
         .then(response => {
             if (!response.ok) throw new Error("Failed to load widget config");
@@ -46,7 +46,94 @@ class Config:
         UPLOAD_FOLDER = os.path.join('/tmp', 'uploads')
     else:
         UPLOAD_FOLDER = os.path.join(basedir, 'app', 'static', 'uploads')
+
+    # Responsive Images: width/format variants written next to local uploads (Pillow; its
+    # wheels include AVIF from 11.3 on). Cloudinary images use the same widths.
+    IMAGE_VARIANT_WIDTHS = [int(w) for w in os.environ.get('IMAGE_VARIANT_WIDTHS', '320,640,1024').split(',')]
+    IMAGE_VARIANT_FORMATS = [f.strip() for f in os.environ.get('IMAGE_VARIANT_FORMATS', 'avif,webp').split(',') if f.strip()]
+    IMAGE_VARIANT_QUALITY = int(os.environ.get('IMAGE_VARIANT_QUALITY', 75))
+    RESOLVE_CACHE_SIZE = int(os.environ.get('RESOLVE_CACHE_SIZE', 4096)) # Memoized resolve_file/resolve_srcset results
+    RESOLVE_SRCSET_TTL = int(os.environ.get('RESOLVE_SRCSET_TTL', 300)) # Local srcsets grow when variants are added
+
+    # Upload Pipeline: 'async' stages locally and pushes in background workers,
+    # 'sync' pushes inside the request (serverless freezes background threads).
+    # UPLOAD_BACKEND: 'auto' (Cloudinary when configured), 'cloudinary' or 'local'
+    UPLOAD_MODE = os.environ.get('UPLOAD_MODE', 'sync' if os.environ.get('VERCEL') else 'async')
+    UPLOAD_BACKEND = os.environ.get('UPLOAD_BACKEND', 'auto')
+    UPLOAD_WORKERS = int(os.environ.get('UPLOAD_WORKERS', 4))
+
+    # Upload Limits: whole request (Werkzeug answers 413), per file, and the longest
+    # image side kept before storing/pushing (0 keeps full size)
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 32 * 1024 * 1024))
+    UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', 10 * 1024 * 1024))
+    UPLOAD_MAX_DIMENSION = int(os.environ.get('UPLOAD_MAX_DIMENSION', 2048))
+
+    # Local Upload Serving: 'app' (send_file from the worker), 'x-accel' (nginx, see
+    # deploy/nginx/default.conf) or 'sendfile' (X-Sendfile)
+    UPLOAD_SERVE_MODE = os.environ.get('UPLOAD_SERVE_MODE', 'app')
+    UPLOAD_ACCEL_PREFIX = os.environ.get('UPLOAD_ACCEL_PREFIX', '/_protected_uploads/')
     
+    # Startup: 'auto' checks the recorded schema version and only syncs on mismatch,
+    # 'sync' always runs create_all + column hotfixes, 'skip' leaves it to `flask schema sync`
+    SCHEMA_STARTUP_CHECK = os.environ.get('SCHEMA_STARTUP_CHECK', 'auto')
+    STARTUP_TIMING_REPORT = os.environ.get('STARTUP_TIMING_REPORT', 'true' if os.environ.get('VERCEL') else 'false').lower() == 'true'
+
+    # Interaction Logging: 'buffered' (write-behind bulk inserts) or 'sync' (commit per message)
+    # Serverless freezes background threads between requests, so Vercel defaults to sync.
+    LOG_DURABILITY = os.environ.get('LOG_DURABILITY', 'sync' if os.environ.get('VERCEL') else 'buffered')
+    LOG_BUFFER_BATCH_SIZE = int(os.environ.get('LOG_BUFFER_BATCH_SIZE', 100))
+    LOG_BUFFER_FLUSH_INTERVAL = float(os.environ.get('LOG_BUFFER_FLUSH_INTERVAL', 2.0))
+    LOG_BUFFER_MAX_PENDING = int(os.environ.get('LOG_BUFFER_MAX_PENDING', 10000))
+    LOG_BUFFER_MAX_ATTEMPTS = int(os.environ.get('LOG_BUFFER_MAX_ATTEMPTS', 3)) # Then a failing batch is retried row by row
+
+    # Admin: clients list page size (keyset pagination)
+    ADMIN_CLIENTS_PAGE_SIZE = int(os.environ.get('ADMIN_CLIENTS_PAGE_SIZE', 50))
+
     # Business Logic / Pricing
     PRICING_PRO_MONTHLY = 49
     TOKEN_COST_PER_INTERACTION = 0.001
+
+    # LLM Providers: base URLs (point at a local mock server to test), keep-alive pools, timeouts
+    LLM_BASE_URLS = {
+        'groq': os.environ.get('GROQ_BASE_URL', 'https://api.groq.com/openai/v1'),
+        'openai': os.environ.get('OPENAI_BASE_URL', 'https://api.openai.com/v1'),
+        'anthropic': os.environ.get('ANTHROPIC_BASE_URL', 'https://api.anthropic.com/v1'),
+        'openai_compatible': os.environ.get('LLM_BASE_URL', 'https://api.groq.com/openai/v1'),
+    }
+    LLM_POOL_CONNECTIONS = int(os.environ.get('LLM_POOL_CONNECTIONS', 4))
+    LLM_POOL_MAXSIZE = int(os.environ.get('LLM_POOL_MAXSIZE', 16))
+    LLM_CONNECT_TIMEOUT = float(os.environ.get('LLM_CONNECT_TIMEOUT', 3.05))
+    LLM_TIMEOUTS = { # (connect, read) in seconds
+        'groq': (LLM_CONNECT_TIMEOUT, float(os.environ.get('GROQ_READ_TIMEOUT', 25))),
+        'openai': (LLM_CONNECT_TIMEOUT, float(os.environ.get('OPENAI_READ_TIMEOUT', 25))),
+        'anthropic': (LLM_CONNECT_TIMEOUT, float(os.environ.get('ANTHROPIC_READ_TIMEOUT', 10))),
+        'openai_compatible': (LLM_CONNECT_TIMEOUT, float(os.environ.get('LLM_READ_TIMEOUT', 25))),
+    }
+
+    # Caching (per-process, invalidated via Client.content_version)
+    PROMPT_CACHE_SIZE = int(os.environ.get('PROMPT_CACHE_SIZE', 512))
+    MENU_INDEX_CACHE_SIZE = int(os.environ.get('MENU_INDEX_CACHE_SIZE', 256))
+    TENANT_CACHE_SIZE = int(os.environ.get('TENANT_CACHE_SIZE', 2048))
+    TENANT_CACHE_TTL = int(os.environ.get('TENANT_CACHE_TTL', 60)) # Max staleness across workers
+    DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 30)) # Admin dashboard global numbers
+
+    # Public Page Cache: rendered menu/chat pages per tenant content version, served with ETags.
+    # max-age bounds how long a browser/CDN may show a page after an admin edit.
+    PAGE_CACHE_SIZE = int(os.environ.get('PAGE_CACHE_SIZE', 512))
+    PAGE_MAX_AGE = int(os.environ.get('PAGE_MAX_AGE', 60))
+    PAGE_STALE_WHILE_REVALIDATE = int(os.environ.get('PAGE_STALE_WHILE_REVALIDATE', 300))
+
+    # Static Pre-render (flask prerender build): directory nginx serves public pages from.
+    # When set, an admin edit also deletes the tenant's prerendered files.
+    PRERENDER_DIR = os.environ.get('PRERENDER_DIR')
+    PRERENDER_BASE_URL = os.environ.get('PRERENDER_BASE_URL', 'http://localhost') # Host baked into absolute URLs
+
+    # Menu Retrieval (AI prompt): menus over the token budget are trimmed to the top-K relevant items
+    MENU_RETRIEVAL_TOP_K = int(os.environ.get('MENU_RETRIEVAL_TOP_K', 15))
+    MENU_CONTEXT_TOKEN_BUDGET = int(os.environ.get('MENU_CONTEXT_TOKEN_BUDGET', 1200))
+
+    # Answer Cache: AI replies to repeated guest questions (Redis shared across workers if configured)
+    ANSWER_CACHE_ENABLED = os.environ.get('ANSWER_CACHE_ENABLED', 'true').lower() == 'true'
+    ANSWER_CACHE_TTL = int(os.environ.get('ANSWER_CACHE_TTL', 3600))
+    ANSWER_CACHE_SIZE = int(os.environ.get('ANSWER_CACHE_SIZE', 2048))
+    ANSWER_CACHE_REDIS_URL = os.environ.get('REDIS_URL')
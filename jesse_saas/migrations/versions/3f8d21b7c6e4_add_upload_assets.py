@@ -0,0 +1,38 @@
+"""Add upload_assets table
+
+Revision ID: 3f8d21b7c6e4
+Revises: e2b7f04c9a61
+Create Date: 2026-10-18 15:02:41.118530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8d21b7c6e4'
+down_revision = 'e2b7f04c9a61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('upload_assets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('staged_path', sa.String(length=255), nullable=False),
+    sa.Column('folder', sa.String(length=50), nullable=False),
+    sa.Column('public_id_prefix', sa.String(length=100), nullable=True),
+    sa.Column('url', sa.String(length=255), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('target_table', sa.String(length=50), nullable=True),
+    sa.Column('target_id', sa.Integer(), nullable=True),
+    sa.Column('target_field', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('upload_assets')
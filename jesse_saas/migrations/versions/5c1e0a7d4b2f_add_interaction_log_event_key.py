@@ -0,0 +1,66 @@
+"""Add event_key to interaction_logs and backfill button clicks
+
+Revision ID: 5c1e0a7d4b2f
+Revises: ce3e81acfc75
+Create Date: 2026-10-18 11:12:30.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e0a7d4b2f'
+down_revision = 'ce3e81acfc75'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10000
+
+# Frozen copy of EventClassifier.EVENT_KEYWORDS at the time of this migration
+# (first match wins, same order as the /api/chat dispatch).
+BACKFILL_CASE = """
+    CASE
+        WHEN lower(coalesce(user_query, '')) LIKE '%menu%' THEN 'menu'
+        WHEN lower(coalesce(user_query, '')) LIKE '%wifi%' THEN 'wifi'
+        WHEN lower(coalesce(user_query, '')) LIKE '%hours%' THEN 'hours'
+        WHEN lower(coalesce(user_query, '')) LIKE '%location%' THEN 'location'
+        WHEN lower(coalesce(user_query, '')) LIKE '%about%' THEN 'about'
+        WHEN lower(coalesce(user_query, '')) LIKE '%reservation%' THEN 'contact'
+        WHEN lower(coalesce(user_query, '')) LIKE '%contact%' THEN 'contact'
+        ELSE 'other'
+    END
+"""
+
+
+def upgrade():
+    with op.batch_alter_table('interaction_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('event_key', sa.String(length=50), nullable=True))
+
+    # Backfill in id ranges, each committed on its own, so a large log table
+    # is never locked by one long UPDATE.
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        low, high = conn.execute(sa.text("SELECT min(id), max(id) FROM interaction_logs")).fetchone()
+        if low is not None:
+            for start in range(low, high + 1, BATCH_SIZE):
+                conn.execute(
+                    sa.text(
+                        f"UPDATE interaction_logs SET event_key = {BACKFILL_CASE} "
+                        "WHERE interaction_type = 'button_click' AND event_key IS NULL "
+                        "AND id >= :start AND id < :end"
+                    ),
+                    {'start': start, 'end': start + BATCH_SIZE}
+                )
+
+        op.create_index('ix_interaction_logs_client_event', 'interaction_logs', ['client_id', 'event_key'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_interaction_logs_client_event', table_name='interaction_logs',
+                      postgresql_concurrently=True, if_exists=True)
+
+    with op.batch_alter_table('interaction_logs', schema=None) as batch_op:
+        batch_op.drop_column('event_key')
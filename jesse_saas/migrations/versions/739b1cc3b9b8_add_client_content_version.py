@@ -0,0 +1,26 @@
+"""Add content_version to Client
+
+Revision ID: 739b1cc3b9b8
+Revises: dddc3deb6a74
+Create Date: 2026-10-18 09:12:04.331207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '739b1cc3b9b8'
+down_revision = 'dddc3deb6a74'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('clients', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_version', sa.Integer(), nullable=True, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('clients', schema=None) as batch_op:
+        batch_op.drop_column('content_version')
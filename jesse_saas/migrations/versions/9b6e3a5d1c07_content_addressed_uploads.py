@@ -0,0 +1,61 @@
+"""Content-addressed upload assets and field references
+
+Revision ID: 9b6e3a5d1c07
+Revises: 3f8d21b7c6e4
+Create Date: 2026-10-18 16:11:05.273914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b6e3a5d1c07'
+down_revision = '3f8d21b7c6e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('upload_asset_refs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('asset_id', sa.Integer(), nullable=False),
+    sa.Column('target_table', sa.String(length=50), nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=False),
+    sa.Column('target_field', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['asset_id'], ['upload_assets.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('target_table', 'target_id', 'target_field', name='uq_upload_asset_refs_target')
+    )
+    op.create_index('ix_upload_asset_refs_asset_id', 'upload_asset_refs', ['asset_id'], unique=False)
+
+    # Targets move from the asset to the reference table (one asset, many fields);
+    # for a field referenced twice the latest asset wins
+    op.execute("""
+        INSERT INTO upload_asset_refs (asset_id, target_table, target_id, target_field, created_at)
+        SELECT MAX(id), target_table, target_id, target_field, MAX(created_at)
+        FROM upload_assets
+        WHERE target_table IS NOT NULL AND target_id IS NOT NULL AND target_field IS NOT NULL
+        GROUP BY target_table, target_id, target_field
+    """)
+
+    # Existing assets keep a NULL hash (timestamped names); new ones are content-addressed
+    with op.batch_alter_table('upload_assets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('uq_upload_assets_content_hash', ['content_hash'])
+        batch_op.drop_column('target_field')
+        batch_op.drop_column('target_id')
+        batch_op.drop_column('target_table')
+
+
+def downgrade():
+    with op.batch_alter_table('upload_assets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('target_table', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('target_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('target_field', sa.String(length=50), nullable=True))
+        batch_op.drop_constraint('uq_upload_assets_content_hash', type_='unique')
+        batch_op.drop_column('content_hash')
+
+    op.drop_index('ix_upload_asset_refs_asset_id', table_name='upload_asset_refs')
+    op.drop_table('upload_asset_refs')
@@ -0,0 +1,48 @@
+"""Add search and filter indexes to clients
+
+Revision ID: a47c9e2d81f3
+Revises: 5c1e0a7d4b2f
+Create Date: 2026-10-18 11:48:02.731946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a47c9e2d81f3'
+down_revision = '5c1e0a7d4b2f'
+branch_labels = None
+depends_on = None
+
+# Postgres only: trigram GIN indexes serve ILIKE '%q%' (the admin clients search).
+# Other dialects fall back to a lower() LIKE scan, fine at local-dev sizes.
+TRIGRAM_INDEXES = (
+    ('ix_clients_restaurant_name_trgm', 'restaurant_name'),
+    ('ix_clients_public_id_trgm', 'public_id'),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        op.create_index('ix_clients_status_plan_id', 'clients', ['status', 'plan_type', 'id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+        if bind.dialect.name == 'postgresql':
+            op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for name, column in TRIGRAM_INDEXES:
+                op.create_index(name, 'clients', [column], unique=False,
+                                postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+                                postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        if bind.dialect.name == 'postgresql':
+            for name, _ in reversed(TRIGRAM_INDEXES):
+                op.drop_index(name, table_name='clients', postgresql_concurrently=True, if_exists=True)
+
+        op.drop_index('ix_clients_status_plan_id', table_name='clients',
+                      postgresql_concurrently=True, if_exists=True)
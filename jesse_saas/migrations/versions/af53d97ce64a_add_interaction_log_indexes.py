@@ -0,0 +1,38 @@
+"""Add composite indexes to interaction_logs
+
+Revision ID: af53d97ce64a
+Revises: 739b1cc3b9b8
+Create Date: 2026-10-18 10:02:47.918532
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'af53d97ce64a'
+down_revision = '739b1cc3b9b8'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_interaction_logs_client_ts', ['client_id', 'timestamp']),
+    ('ix_interaction_logs_client_type_ts', ['client_id', 'interaction_type', 'timestamp']),
+    ('ix_interaction_logs_timestamp', ['timestamp']),
+)
+
+
+def upgrade():
+    # CONCURRENTLY on Postgres so a large log table stays writable during the build.
+    # It cannot run inside a transaction, hence the autocommit block.
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'interaction_logs', columns, unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='interaction_logs',
+                          postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,46 @@
+"""Add interaction_daily_rollup table
+
+Revision ID: ce3e81acfc75
+Revises: af53d97ce64a
+Create Date: 2026-10-18 10:41:09.204417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ce3e81acfc75'
+down_revision = 'af53d97ce64a'
+branch_labels = None
+depends_on = None
+
+LABEL_EVENT = ("CASE WHEN interaction_type = 'button_click' "
+               "THEN substr(lower(trim(coalesce(user_query, ''))), 1, 50) ELSE '' END")
+
+
+def upgrade():
+    op.create_table('interaction_daily_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('interaction_type', sa.String(length=50), nullable=False),
+    sa.Column('event', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('client_id', 'date', 'interaction_type', 'event', name='uq_interaction_daily_rollup_bucket')
+    )
+    # Existing history, bucketed as RollupService did at this revision: clicks by
+    # their lowercased label, AI chat in one bucket per day
+    op.execute("""
+        INSERT INTO interaction_daily_rollup (client_id, date, interaction_type, event, count)
+        SELECT client_id, date(timestamp), interaction_type, {event}, COUNT(*)
+        FROM interaction_logs
+        WHERE timestamp IS NOT NULL
+        GROUP BY client_id, date(timestamp), interaction_type, {event}
+    """.format(event=LABEL_EVENT))
+
+
+def downgrade():
+    op.drop_table('interaction_daily_rollup')
@@ -0,0 +1,39 @@
+"""Key button-click rollup rows by event_key instead of the raw label
+
+Revision ID: d71f4c2a9e58
+Revises: 9b6e3a5d1c07
+Create Date: 2026-10-18 18:24:52.601337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd71f4c2a9e58'
+down_revision = '9b6e3a5d1c07'
+branch_labels = None
+depends_on = None
+
+
+def _rebuild(event):
+    # Every bucket is regrouped from the logs (as RollupService.backfill does), so a
+    # rollup that was never filled or fell behind comes out complete as well
+    op.execute("DELETE FROM interaction_daily_rollup")
+    op.execute(f"""
+        INSERT INTO interaction_daily_rollup (client_id, date, interaction_type, event, count)
+        SELECT client_id, date(timestamp), interaction_type, {event}, COUNT(*)
+        FROM interaction_logs
+        WHERE timestamp IS NOT NULL
+        GROUP BY client_id, date(timestamp), interaction_type, {event}
+    """)
+
+
+def upgrade():
+    # event_key was backfilled for every click by 5c1e0a7d4b2f
+    _rebuild("CASE WHEN interaction_type = 'button_click' THEN coalesce(event_key, 'other') ELSE '' END")
+
+
+def downgrade():
+    _rebuild("CASE WHEN interaction_type = 'button_click' "
+             "THEN substr(lower(trim(coalesce(user_query, ''))), 1, 50) ELSE '' END")
@@ -0,0 +1,30 @@
+"""Add schema_version table
+
+Revision ID: e2b7f04c9a61
+Revises: a47c9e2d81f3
+Create Date: 2026-10-18 12:20:14.402871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7f04c9a61'
+down_revision = 'a47c9e2d81f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('schema_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.String(length=32), nullable=False),
+    sa.Column('applied_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Not recorded here: `flask schema sync` (or the first startup) writes the row
+
+
+def downgrade():
+    op.drop_table('schema_version')
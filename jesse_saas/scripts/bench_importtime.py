@@ -0,0 +1,128 @@
+"""
+Import-cost benchmark for serverless cold starts.
+
+Boots the app in a fresh interpreter under `python -X importtime`, serves the
+public routes once (widget config, button chat, menu and chat pages) and then:
+
+  * prints the packages that cost the most to import,
+  * fails if the total import time exceeds the budget,
+  * fails if an optional integration (cloudinary, requests, qrcode, ...) was
+    loaded, since none of them is needed to serve those routes.
+
+    python scripts/bench_importtime.py                  # budget from IMPORT_BUDGET_MS (default 900)
+    python scripts/bench_importtime.py --budget-ms 600 --top 25
+
+Uses a throwaway SQLite database; never touches the configured one.
+"""
+import sys
+import os
+import argparse
+import json
+import re
+import subprocess
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Optional integrations that must stay lazy on the public request path
+LAZY_MODULES = ('cloudinary', 'requests', 'qrcode', 'PIL', 'redis', 'alembic')
+
+# Runs in the child interpreter
+PROBE = """
+import json, sys
+from app import create_app, db
+from app.services.client_manager import ClientManager
+
+app = create_app()
+with app.app_context():
+    tenant = ClientManager.create_client("Import Bench", "basic")
+    public_id = tenant.public_id
+
+http = app.test_client()
+statuses = [
+    http.get(f'/api/config/{public_id}').status_code,
+    http.post('/api/chat', json={'public_id': public_id, 'type': 'button_click', 'message': 'Menu'}).status_code,
+    http.get(f'/menu/{public_id}').status_code,
+    http.get(f'/chat/{public_id}').status_code,
+]
+print(json.dumps({'statuses': statuses, 'modules': sorted(sys.modules)}))
+"""
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def parse_importtime(stderr):
+    """
+    Returns (total_us, {package: self_us}): the total is the sum of top-level
+    cumulative times; self time is grouped by root package (sqlalchemy, app, ...).
+    """
+    total = 0
+    packages = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        if len(indent) == 1: # Top-level import
+            total += cumulative_us
+        root = module.split('.')[0]
+        packages[root] = packages.get(root, 0) + self_us
+    return total, packages
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    # Default budget: runs measure ~580-770 ms (about 400 of it SQLAlchemy), so
+    # 900 absorbs machine noise but still trips on a new eager dependency (alembic alone was ~220 ms)
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('IMPORT_BUDGET_MS', 900)),
+                        help="Maximum total import time in milliseconds")
+    parser.add_argument('--top', type=int, default=15, help="How many packages to list")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.update({
+            'DATABASE_URL': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            'LOG_DURABILITY': 'sync',
+            'STARTUP_TIMING_REPORT': 'false',
+        })
+        env.pop('VERCEL', None)
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE],
+            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+        )
+
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        print("❌ Probe failed to boot the app.")
+        sys.exit(2)
+
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    total_us, packages = parse_importtime(result.stderr)
+    total_ms = total_us / 1000
+
+    print(f"Top {args.top} packages by import time (self time, all submodules):")
+    for module, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {module}")
+    print(f"\nTotal import time: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"Route statuses: {probe['statuses']}")
+
+    failed = False
+    loaded = [name for name in LAZY_MODULES if name in probe['modules']]
+    if loaded:
+        print(f"❌ Loaded on the public path (should be lazy): {', '.join(loaded)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"❌ Import time over budget by {total_ms - args.budget_ms:.1f} ms")
+        failed = True
+    if any(status >= 500 for status in probe['statuses']):
+        print("❌ A public route errored during the probe.")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("✅ Import cost within budget; optional integrations stay lazy.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Query plan audit for interaction_logs.
+
+Prints EXPLAIN output (markdown) for every analytics query that reads the
+log table or its daily rollup, using the database configured in the environment:
+
+    python scripts/explain_interaction_logs.py                   # current DB
+    python scripts/explain_interaction_logs.py --seed 50000      # scratch DB: add fake rows, rebuild the rollup + ANALYZE
+    python scripts/explain_interaction_logs.py --seed 50000 --clients 5000  # ... spread over more clients
+    python scripts/explain_interaction_logs.py --baseline        # scratch DB: plans without the indexes
+
+--seed and --baseline modify data/schema (baseline drops the indexes inside a
+rolled-back transaction); only use them on a scratch database.
+The checked-in report lives in docs/query_plans/interaction_logs.md.
+"""
+import sys
+import os
+import argparse
+import random
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from app import create_app, db
+from app.models import Client, InteractionLog
+from app.services.rollup_service import RollupService
+
+INDEXES = ('ix_interaction_logs_client_ts', 'ix_interaction_logs_client_type_ts', 'ix_interaction_logs_timestamp',
+           'ix_interaction_logs_client_event')
+# Postgres only (migration a47c9e2d81f3): the admin clients search
+TRIGRAM_INDEXES = ('ix_clients_restaurant_name_trgm', 'ix_clients_public_id_trgm')
+
+
+def audit_queries(dialect):
+    queries = [
+        # Raw log reads: one client's rows, or the newest rows overall
+        ("get_export_csv",
+         "SELECT timestamp, interaction_type, user_query FROM interaction_logs "
+         "WHERE client_id = :cid ORDER BY timestamp DESC"),
+        ("conversations view (latest 50)",
+         "SELECT * FROM interaction_logs WHERE client_id = :cid ORDER BY timestamp DESC LIMIT 50"),
+        ("dashboard live feed",
+         "SELECT * FROM interaction_logs ORDER BY timestamp DESC LIMIT 15"),
+        # Aggregates: summed from interaction_daily_rollup
+        ("ai_chat total (get_client_overview)",
+         "SELECT sum(count) FROM interaction_daily_rollup "
+         "WHERE client_id = :cid AND interaction_type = 'ai_chat'"),
+        ("get_trend_data",
+         "SELECT date, sum(count) AS count FROM interaction_daily_rollup "
+         "WHERE client_id = :cid AND date >= :since GROUP BY date"),
+        ("get_events_breakdown",
+         "SELECT event, sum(count) FROM interaction_daily_rollup "
+         "WHERE client_id = :cid AND interaction_type = 'button_click' GROUP BY event"),
+        ("get_top_clients",
+         "SELECT clients.id, coalesce(totals.total, 0) AS interaction_count FROM clients "
+         "LEFT OUTER JOIN (SELECT client_id, sum(count) AS total FROM interaction_daily_rollup "
+         "GROUP BY client_id) AS totals ON clients.id = totals.client_id "
+         "ORDER BY coalesce(totals.total, 0) DESC LIMIT 5"),
+    ]
+    if dialect == 'postgresql':
+        queries.append(
+            ("admin clients search (ClientManager.search_clients)",
+             "SELECT * FROM clients WHERE (restaurant_name ILIKE :q OR public_id ILIKE :q) "
+             "ORDER BY id LIMIT 51"))
+    return queries
+
+
+def seed(rows, client_count=20):
+    clients = [Client(restaurant_name=f"Explain Seed {i}", slug=f"explain-seed-{i}") for i in range(client_count)]
+    db.session.add_all(clients)
+    db.session.commit()
+
+    now = datetime.utcnow()
+    labels = ['menu', 'location', 'contact', 'hours', 'wifi']
+    batch = []
+    for i in range(rows):
+        label = random.choice(labels)
+        batch.append({
+            'client_id': random.choice(clients).id,
+            'interaction_type': random.choice(['ai_chat', 'button_click']),
+            'user_query': label,
+            'event_key': label,
+            'timestamp': now - timedelta(minutes=random.randint(0, 60 * 24 * 90))
+        })
+        if len(batch) == 5000:
+            db.session.execute(InteractionLog.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(InteractionLog.__table__.insert(), batch)
+    db.session.commit()
+    RollupService.backfill()
+    if db.engine.dialect.name == 'postgresql':
+        # VACUUM also sets the visibility map, as autovacuum would on a live table,
+        # so index-only scans are costed realistically; it cannot run in a transaction
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text("VACUUM ANALYZE"))
+    else:
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+
+
+def explain(dialect, sql, params):
+    prefix = "EXPLAIN " if dialect == 'postgresql' else "EXPLAIN QUERY PLAN "
+    rows = db.session.execute(text(prefix + sql), params).fetchall()
+    if dialect == 'postgresql':
+        return "\n".join(row[0] for row in rows)
+    # SQLite: (id, parent, notused, detail)
+    return "\n".join(row[-1] for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seed', type=int, default=0, help="Insert N fake log rows and ANALYZE first")
+    parser.add_argument('--clients', type=int, default=20, help="Clients the seeded rows are spread over")
+    parser.add_argument('--baseline', action='store_true', help="Explain without the interaction_logs indexes")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        dialect = db.engine.dialect.name
+        if args.seed:
+            seed(args.seed, args.clients)
+
+        if args.baseline:
+            for name in INDEXES + (TRIGRAM_INDEXES if dialect == 'postgresql' else ()):
+                db.session.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+        params = {'cid': 1, 'since': (datetime.utcnow() - timedelta(days=7)).date(), 'q': '%seed 1234%'}
+        print(f"## {dialect} ({'without' if args.baseline else 'with'} indexes)\n")
+        for title, sql in audit_queries(dialect):
+            print(f"### {title}\n")
+            print(f"```sql\n{sql}\n```\n")
+            print(f"```\n{explain(dialect, sql, params)}\n```\n")
+
+        # Never keep the dropped indexes. pysqlite autocommits DDL, so the
+        # rollback alone does not bring them back on SQLite.
+        db.session.rollback()
+        if args.baseline:
+            for index in InteractionLog.__table__.indexes:
+                index.create(db.engine, checkfirst=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -26,7 +26,7 @@ def test_ai_service_dispatch():
     mock_kb.ai_provider = "groq"
     mock_kb.ai_model = "llama3-70b-8192"
     
-    with patch('requests.post') as mock_post:
+    with patch('requests.Session.post') as mock_post:
         mock_response = MagicMock()
         mock_response.json.return_value = {
             'choices': [{'message': {'content': 'Groq Response'}}]
@@ -48,7 +48,7 @@ def test_ai_service_dispatch():
     mock_kb.ai_provider = "openai"
     mock_kb.ai_model = "gpt-4o"
     
-    with patch('requests.post') as mock_post:
+    with patch('requests.Session.post') as mock_post:
         mock_response = MagicMock()
         mock_response.json.return_value = {
             'choices': [{'message': {'content': 'OpenAI Response'}}]
@@ -69,7 +69,7 @@ def test_ai_service_dispatch():
     mock_kb.ai_provider = "anthropic"
     mock_kb.ai_model = "claude-3-opus"
     
-    with patch('requests.post') as mock_post:
+    with patch('requests.Session.post') as mock_post:
         mock_response = MagicMock()
         mock_response.json.return_value = {
             'content': [{'text': 'Anthropic Response'}]
@@ -44,7 +44,7 @@ def test_env_fallback():
 
     print("\n1. Testing 'openai_compatible' logic from ENV...")
     
-    with patch('requests.post') as mock_post:
+    with patch('requests.Session.post') as mock_post:
         mock_response = MagicMock()
         mock_response.json.return_value = {
             'choices': [{'message': {'content': 'Env Fallback Response'}}]
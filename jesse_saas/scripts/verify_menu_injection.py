@@ -79,7 +79,7 @@ def test_menu_injection():
         MenuItemMock.query.filter_by.return_value.all.return_value = mock_items
         
         with patch('app.services.ai_service.MenuItem', MenuItemMock):
-            with patch('app.services.ai_service.requests.post') as mock_post:
+            with patch('requests.Session.post') as mock_post:
                 # Mock API response
                 mock_response = MagicMock()
                 mock_response.json.return_value = {'choices': [{'message': {'content': 'OK'}}]}
@@ -34,7 +34,7 @@ def test_params_propagation():
     MenuItemMock.query.filter_by.return_value.all.return_value = []
     
     with patch('app.services.ai_service.MenuItem', MenuItemMock):
-        with patch('app.services.ai_service.requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             # Mock API response
             mock_response = MagicMock()
             mock_response.json.return_value = {'choices': [{'message': {'content': 'OK'}}]}
@@ -1,5 +1,11 @@
+import os
 import pytest
+
+# Keep the suite off the local site.db (Config reads this at import time)
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
 from app import create_app, db
+from app.services.cache_service import CacheService
 
 @pytest.fixture
 def app():
@@ -8,7 +14,8 @@ def app():
     app.config.update({
         "TESTING": True,
         "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
-        "WTF_CSRF_ENABLED": False
+        "WTF_CSRF_ENABLED": False,
+        "LOG_DURABILITY": "sync"
     })
 
     with app.app_context():
@@ -16,6 +23,7 @@ def app():
         yield app
         db.session.remove()
         db.drop_all()
+        CacheService.clear_all()
 
 @pytest.fixture
 def client(app):
@@ -0,0 +1,59 @@
+from sqlalchemy import event
+from app.extensions import db
+from app.services.analytics import AnalyticsService
+from app.services.client_manager import ClientManager
+from app.services.log_ingest import LogIngestService
+
+
+def test_clients_search_and_keyset_pages(app, client):
+    names = ["Sushi Bar", "Pizza Place", "SUSHI Express", "Taco 100%", "sushi-go"]
+    tenants = [ClientManager.create_client(name, "basic") for name in names]
+    tenants[1].status = 'inactive'
+    db.session.commit()
+
+    clients, prev_cursor, next_cursor = ClientManager.search_clients('sushi', limit=2)
+    assert [c.restaurant_name for c in clients] == ["Sushi Bar", "SUSHI Express"]
+    assert prev_cursor is None
+
+    clients, prev_cursor, next_cursor = ClientManager.search_clients('sushi', after=next_cursor, limit=2)
+    assert [c.restaurant_name for c in clients] == ["sushi-go"]
+    assert next_cursor is None
+
+    clients, prev_cursor, _ = ClientManager.search_clients('sushi', before=prev_cursor, limit=2)
+    assert [c.restaurant_name for c in clients] == ["Sushi Bar", "SUSHI Express"]
+    assert prev_cursor is None
+
+    # Wildcards in the search term are literal
+    assert [c.restaurant_name for c in ClientManager.search_clients('0%')[0]] == ["Taco 100%"]
+
+    assert AnalyticsService.get_client_stats() == {"total": 5, "active": 4, "pending": 1}
+
+    with client.session_transaction() as sess:
+        sess['admin_logged_in'] = True
+    page = client.get('/admin/clients', query_string={'q': 'sushi', 'status': 'active'}).get_data(as_text=True)
+    assert "SUSHI Express" in page and "Pizza Place" not in page
+
+
+def test_dashboard_stats_single_query_and_cached(app, client):
+    ClientManager.create_client("Pro Grill", "pro")
+    basic = ClientManager.create_client("Basic Cafe", "basic")
+    LogIngestService.record(basic.id, 'button_click', 'Menu', event_key='menu')
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        stats = AnalyticsService.get_dashboard_stats()
+        assert len(statements) == 1
+        assert AnalyticsService.get_dashboard_stats() is stats
+        assert len(statements) == 1
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert (stats['total_clients'], stats['pro_clients'], stats['basic_clients']) == (2, 1, 1)
+    assert stats['total_interactions'] == 1 and stats['mrr'] == 49
+
+    with client.session_transaction() as sess:
+        sess['admin_logged_in'] = True
+    page = client.get('/admin/dashboard').get_data(as_text=True)
+    assert "Basic Cafe" in page
@@ -0,0 +1,82 @@
+from app.extensions import db
+from app.models import MenuItem
+from app.services.ai_service import AIService
+from app.services.client_manager import ClientManager
+from app.services.menu_service import MenuService
+
+
+def test_system_prompt_is_cached_per_content_version(app):
+    client = ClientManager.create_client("Prompt Bistro", "pro")
+    db.session.add(MenuItem(client_id=client.id, name="Nasi Goreng", price=5.0))
+    db.session.commit()
+
+    prompt = AIService.get_system_prompt(client, client.knowledge_base)
+    assert "Nasi Goreng" in prompt
+
+    # Direct DB writes bypass the services, so the cached prompt is served
+    db.session.add(MenuItem(client_id=client.id, name="Sate Ayam", price=4.0))
+    db.session.commit()
+    assert AIService.get_system_prompt(client, client.knowledge_base) == prompt
+
+    # Service writes bump the content version and invalidate the cache
+    MenuService.create_item(client, {'name': 'Es Teh', 'price': '1'}, None)
+    prompt = AIService.get_system_prompt(client, client.knowledge_base)
+    assert "Sate Ayam" in prompt
+    assert "Es Teh" in prompt
+
+
+def test_provider_sessions_are_pooled_per_origin():
+    from app.services.provider_client import ProviderClient
+
+    groq = ProviderClient.session_for("https://api.groq.com/openai/v1/chat/completions")
+    assert ProviderClient.session_for("https://api.groq.com/openai/v1/models") is groq
+    assert ProviderClient.session_for("http://localhost:9000/v1/chat/completions") is not groq
+
+    connect, read = ProviderClient.timeout('anthropic')
+    assert connect < read
+
+
+def test_repeated_questions_are_answered_from_cache(app, monkeypatch):
+    from app.services.answer_cache import normalize_question
+
+    assert normalize_question("  Vegan   options?? ") == "vegan options"
+
+    client = ClientManager.create_client("Cache Kitchen", "pro")
+    client.knowledge_base.ai_api_key = "sk-test"
+    db.session.commit()
+
+    calls = []
+    def fake_groq(*args):
+        calls.append(args)
+        return "Yes, we have a vegan salad."
+    monkeypatch.setattr(AIService, '_call_groq', fake_groq)
+
+    kb = client.knowledge_base
+    assert AIService.generate_smart_reply("Vegan options?", client, kb) == "Yes, we have a vegan salad."
+    assert AIService.generate_smart_reply("vegan  OPTIONS", client, kb) == "Yes, we have a vegan salad."
+    assert len(calls) == 1
+
+    # Editing the bot starts the tenant with a fresh cache
+    from app.services.bot_service import BotService
+    BotService.update_ai_settings(client, {'ai_provider': 'groq', 'temperature': '0.2'})
+    AIService.generate_smart_reply("Vegan options?", client, kb)
+    assert len(calls) == 2
+
+
+def test_answer_cache_imports_redis_only_when_configured(monkeypatch):
+    import sys
+    import types
+    from app.services import answer_cache
+    from config import Config
+
+    monkeypatch.setattr(answer_cache, '_backend', None)
+    monkeypatch.setattr(Config, 'ANSWER_CACHE_REDIS_URL', None)
+    monkeypatch.setitem(sys.modules, 'redis', None) # Any import attempt raises ImportError
+    assert isinstance(answer_cache.AnswerCache.backend(), answer_cache.LocalAnswerBackend)
+
+    fake = types.SimpleNamespace(Redis=types.SimpleNamespace(from_url=lambda url: ('client', url)))
+    monkeypatch.setitem(sys.modules, 'redis', fake)
+    monkeypatch.setattr(answer_cache, '_backend', None)
+    monkeypatch.setattr(Config, 'ANSWER_CACHE_REDIS_URL', 'redis://cache:6379/0')
+    backend = answer_cache.AnswerCache.backend()
+    assert isinstance(backend, answer_cache.RedisAnswerBackend) and backend.client == ('client', 'redis://cache:6379/0')
@@ -0,0 +1,89 @@
+import gzip
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import InteractionLog, InteractionDailyRollup
+from app.services.analytics import AnalyticsService
+from app.services.client_manager import ClientManager
+from app.services.event_classifier import EventClassifier
+from app.services.log_ingest import LogIngestService
+from app.services.rollup_service import RollupService
+
+
+def test_ingest_maintains_daily_rollup(app):
+    tenant = ClientManager.create_client("Rollup Resto", "pro")
+
+    LogIngestService.record(tenant.id, 'ai_chat', 'hello')
+    LogIngestService.record(tenant.id, 'ai_chat', 'vegan?')
+    LogIngestService.record(tenant.id, 'button_click', 'Menu')
+
+    overview = AnalyticsService.get_client_overview(tenant.id)
+    assert overview['total_conversations'] == 3
+    assert overview['ai_ratio'] == 66.7
+    assert AnalyticsService.get_trend_data(tenant.id)['counts'][-1] == 3
+    assert AnalyticsService.get_dashboard_stats()['total_interactions'] == 3
+    assert AnalyticsService.get_top_clients()[0].interaction_count == 3
+
+
+def test_backfill_rebuilds_rollup_from_history(app, runner):
+    tenant = ClientManager.create_client("Old Logs Cafe", "basic")
+    old = datetime.utcnow() - timedelta(days=3)
+    db.session.add_all([
+        InteractionLog(client_id=tenant.id, interaction_type='button_click', user_query='Menu', timestamp=old),
+        InteractionLog(client_id=tenant.id, interaction_type='button_click', user_query='menu', timestamp=old),
+        InteractionLog(client_id=tenant.id, interaction_type='ai_chat', user_query='hi', timestamp=old),
+    ])
+    db.session.commit()
+
+    result = runner.invoke(args=['analytics', 'backfill-rollup'])
+    assert "2 buckets" in result.output
+
+    buckets = {(r.interaction_type, r.event): r.count for r in InteractionDailyRollup.query.all()}
+    assert buckets == {('button_click', 'menu'): 2, ('ai_chat', ''): 1}
+    LogIngestService.record(tenant.id, 'button_click', '🍽️ View Menu')
+    assert InteractionDailyRollup.query.filter_by(event='menu').count() == 2 # Same event_key, new day
+
+
+def test_events_breakdown_groups_by_event_key(app, client):
+    tenant = ClientManager.create_client("Events Bistro", "basic")
+    for label in ['🍽️ Menu', 'View Menu', 'Opening Hours', 'Book a Reservation', 'Surprise me']:
+        client.post('/api/chat', json={'public_id': tenant.public_id, 'type': 'button_click', 'message': label})
+    LogIngestService.record(tenant.id, 'ai_chat', 'is the menu vegan?')
+
+    # Clicks logged before event_key existed are classified by the backfill
+    db.session.add(InteractionLog(client_id=tenant.id, interaction_type='button_click', user_query='Our Location'))
+    db.session.commit()
+    assert EventClassifier.backfill() == 1
+    RollupService.backfill(client_id=tenant.id) # Logged outside the ingest path
+
+    breakdown = AnalyticsService.get_events_breakdown(tenant.id)
+    assert breakdown == {
+        'Menu Clicks': 2, 'WiFi Clicks': 0, 'Hours Clicks': 1, 'Location Clicks': 1,
+        'About Clicks': 0, 'Contact Clicks': 1, 'Other Clicks': 1
+    }
+
+
+def test_csv_export_streams_filtered_and_gzipped(app, client):
+    tenant = ClientManager.create_client("Export Diner", "pro")
+    db.session.add_all([
+        InteractionLog(client_id=tenant.id, interaction_type='ai_chat', user_query='old', timestamp=datetime(2026, 1, 1, 9)),
+        InteractionLog(client_id=tenant.id, interaction_type='ai_chat', user_query='in range', timestamp=datetime(2026, 2, 1, 23)),
+    ])
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['admin_logged_in'] = True
+
+    url = f'/admin/client/{tenant.id}/stats/export_csv'
+    response = client.get(url, query_string={'start': '2026-02-01', 'end': '2026-02-01'})
+    assert response.is_streamed
+    assert response.get_data(as_text=True).splitlines() == [
+        'Timestamp,Type,Query/Content', '2026-02-01 23:00:00,ai_chat,in range'
+    ]
+
+    response = client.get(url, query_string={'gzip': '1'})
+    assert response.mimetype == 'application/gzip'
+    lines = gzip.decompress(response.get_data()).decode().splitlines()
+    assert lines[1:] == ['2026-02-01 23:00:00,ai_chat,in range', '2026-01-01 09:00:00,ai_chat,old']
+
+    # Chunked in batches: the same rows whatever the batch size
+    chunks = list(AnalyticsService.iter_export_csv(tenant.id, batch_size=1))
+    assert len(chunks) == 2 and ''.join(chunks).count('\n') == 3
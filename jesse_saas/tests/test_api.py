@@ -0,0 +1,121 @@
+from app.extensions import db
+from app.models import InteractionLog
+from app.services.ai_service import AIService
+from app.services.client_manager import ClientManager
+
+
+def test_chat_stream_relays_tokens_and_logs(client, monkeypatch):
+    tenant = ClientManager.create_client("Stream Cafe", "pro")
+    monkeypatch.setattr(AIService, 'stream_smart_reply',
+                        lambda message, client_model, kb: iter(["Hello", " there"]))
+
+    response = client.post('/api/chat/stream', json={
+        'public_id': tenant.public_id,
+        'message': 'hi'
+    })
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert 'event: token\ndata: {"text": "Hello"}' in body
+    assert 'event: done\ndata: {"response": "Hello there"}' in body
+    assert InteractionLog.query.filter_by(client_id=tenant.id, interaction_type='ai_chat').count() == 1
+
+
+def test_chat_stream_requires_pro_plan(client):
+    tenant = ClientManager.create_client("Basic Cafe", "basic")
+    response = client.post('/api/chat/stream', json={'public_id': tenant.public_id, 'message': 'hi'})
+    assert response.status_code == 403
+
+
+def test_config_snapshot_is_invalidated_by_admin_writes(client):
+    tenant = ClientManager.create_client("Old Name", "basic")
+
+    assert client.get(f'/api/config/{tenant.public_id}').get_json()['restaurant_name'] == "Old Name"
+
+    ClientManager.update_hub_settings(tenant, {'restaurant_name': 'New Name', 'slug': 'new-name', 'status': 'active'})
+    assert client.get(f'/api/config/{tenant.public_id}').get_json()['restaurant_name'] == "New Name"
+    assert client.get('/menu/new-name').status_code == 200
+    assert client.get(f'/chat/{tenant.public_id}').status_code == 200
+
+
+def test_buffered_logging_flushes_in_bulk(app, client):
+    from app.services.log_ingest import LogIngestService
+
+    app.config['LOG_DURABILITY'] = 'buffered'
+    tenant = ClientManager.create_client("Busy Bar", "basic")
+
+    for _ in range(3):
+        response = client.post('/api/chat', json={
+            'public_id': tenant.public_id,
+            'type': 'button_click',
+            'message': 'menu'
+        })
+        assert response.status_code == 200
+
+    LogIngestService.flush()
+    assert InteractionLog.query.filter_by(client_id=tenant.id).count() == 3
+    assert LogIngestService.pending() == 0
+
+
+def test_buffered_logging_drops_only_rows_that_keep_failing(app, monkeypatch):
+    from sqlalchemy.exc import IntegrityError
+    from app.services.log_ingest import LogIngestService
+    from app.services.rollup_service import RollupService
+
+    app.config['LOG_DURABILITY'] = 'buffered'
+    tenant = ClientManager.create_client("Steady Stall", "basic")
+    apply = RollupService.apply
+
+    def reject_deleted_client(conn, rows):
+        if any(row['client_id'] == 999 for row in rows):
+            raise IntegrityError('INSERT', {}, Exception('FOREIGN KEY constraint failed'))
+        return apply(conn, rows)
+    monkeypatch.setattr(RollupService, 'apply', staticmethod(reject_deleted_client))
+
+    LogIngestService.record(tenant.id, 'ai_chat', 'hello')
+    LogIngestService.record(999, 'ai_chat', 'orphan')
+    LogIngestService.record(tenant.id, 'button_click', 'Menu')
+
+    for _ in range(app.config['LOG_BUFFER_MAX_ATTEMPTS']):
+        LogIngestService.flush()
+    assert LogIngestService.pending() == 0
+    assert InteractionLog.query.filter_by(client_id=tenant.id).count() == 2
+    assert InteractionLog.query.filter_by(client_id=999).count() == 0
+
+
+def test_config_has_etag_and_answers_304_until_edit(client):
+    tenant = ClientManager.create_client("Etag Eatery", "basic")
+
+    first = client.get(f'/api/config/{tenant.public_id}')
+    assert first.status_code == 200 and 'stale-while-revalidate' in first.headers['Cache-Control']
+    etag = first.headers['ETag']
+    assert client.get(f'/api/config/{tenant.public_id}', headers={'If-None-Match': etag}).status_code == 304
+
+    ClientManager.update_hub_settings(tenant, {'restaurant_name': 'Etag Eatery 2', 'slug': 'etag-eatery', 'status': 'active'})
+    edited = client.get(f'/api/config/{tenant.public_id}', headers={'If-None-Match': etag})
+    assert edited.status_code == 200 and edited.get_json()['restaurant_name'] == 'Etag Eatery 2'
+
+
+def test_widget_script_inlines_config(client):
+    tenant = ClientManager.create_client("Inline Inn", "basic")
+
+    script = client.get(f'/api/widget/{tenant.public_id}.js')
+    assert script.status_code == 200 and script.mimetype == 'application/javascript'
+    assert b'const INLINE_BOOT = null;' not in script.data
+    assert b'"restaurant_name": "Inline Inn"' in script.data
+    assert client.get('/api/widget/missing.js').status_code == 404
+
+
+def test_config_urls_follow_the_request_host(client):
+    tenant = ClientManager.create_client("Host Header Hut", "basic")
+    tenant.knowledge_base.avatar_image = 'avatars/chef.png'
+    db.session.commit()
+
+    live = client.get(f'/api/config/{tenant.public_id}', base_url='https://jesse.example')
+    assert live.get_json()['avatar_url'] == 'https://jesse.example/static/uploads/avatars/chef.png'
+    # Each host gets its own cached page, never another host's URLs
+    other = client.get(f'/api/config/{tenant.public_id}', headers={'Host': 'other.test'})
+    assert other.get_json()['avatar_url'] == 'http://other.test/static/uploads/avatars/chef.png'
+    widget = client.get(f'/api/widget/{tenant.public_id}.js', base_url='https://jesse.example')
+    assert b'other.test' not in widget.data and b'https://jesse.example/static/uploads/avatars/chef.png' in widget.data
@@ -0,0 +1,46 @@
+import pytest
+from app.extensions import db
+from app.models import MenuItem
+from app.services.client_manager import ClientManager
+from app.services.menu_retrieval import MenuIndex, MenuRetriever
+
+
+ITEMS = [
+    {'name': 'Beef Burger', 'category': 'Food', 'price': 9.0, 'description': 'Grilled beef patty', 'labels': None, 'allergy_info': 'gluten'},
+    {'name': 'Garden Salad', 'category': 'Food', 'price': 6.0, 'description': 'Fresh greens', 'labels': 'Vegan', 'allergy_info': None},
+    {'name': 'Iced Latte', 'category': 'Drink', 'price': 4.0, 'description': 'Espresso over ice', 'labels': None, 'allergy_info': 'dairy'},
+]
+
+
+def test_bm25_ranks_relevant_items_first():
+    index = MenuIndex(ITEMS)
+
+    assert [item['name'] for _, item in index.search('any vegan options?')] == ['Garden Salad']
+    assert index.search('burgers')[0][1]['name'] == 'Beef Burger'
+    assert index.search('parking') == []
+
+
+def test_large_menu_is_trimmed_to_relevant_items(app):
+    client = ClientManager.create_client("Big Menu Diner", "pro")
+    for i in range(60):
+        db.session.add(MenuItem(client_id=client.id, name=f"Noodle Bowl {i}", category="Noodles",
+                                price=5.0, description="Hand pulled noodles in broth"))
+    db.session.add(MenuItem(client_id=client.id, name="Mango Sticky Rice", category="Dessert", price=4.0))
+    db.session.commit()
+
+    text = MenuRetriever.build_menu_text(client, "do you have mango dessert?", top_k=5, token_budget=200)
+
+    assert text.startswith("Categories: Noodles (60 items), Dessert (1 items)")
+    assert "Mango Sticky Rice" in text
+    assert text.count("\n") <= 5
+
+
+def test_full_menu_text_is_built_once_per_version(app, monkeypatch):
+    client = ClientManager.create_client("Small Menu Cafe", "basic")
+    db.session.add(MenuItem(client_id=client.id, name="Toast", category="Breakfast", price=3.0))
+    db.session.commit()
+    assert MenuRetriever.build_menu_text(client, "toast?") == "- Toast ($3.0)"
+
+    import app.services.menu_retrieval as menu_retrieval
+    monkeypatch.setattr(menu_retrieval, 'format_item', lambda item: pytest.fail("formatted again"))
+    assert MenuRetriever.build_menu_text(client, "eggs?") == "- Toast ($3.0)"
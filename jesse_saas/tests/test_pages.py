@@ -0,0 +1,95 @@
+from sqlalchemy import event
+from werkzeug.datastructures import MultiDict
+from app.extensions import db
+from app.services.client_manager import ClientManager
+from app.services.menu_service import MenuService
+
+
+def count_queries():
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_menu_page_is_cached_with_etag_until_menu_edit(client):
+    tenant = ClientManager.create_client("Menu Cache Diner", "basic")
+    MenuService.create_item(tenant, MultiDict({'name': 'Pancakes', 'category': 'Breakfast', 'price': '7'}), {})
+
+    first = client.get(f'/menu/{tenant.slug}')
+    assert first.status_code == 200 and b'Pancakes' in first.data
+    assert first.headers['Cache-Control'].startswith('public, max-age=')
+    etag = first.headers['ETag']
+
+    statements = count_queries()
+    again = client.get(f'/menu/{tenant.slug}')
+    assert again.data == first.data and not statements # Snapshot + page both cached
+
+    assert client.get(f'/menu/{tenant.slug}', headers={'If-None-Match': etag}).status_code == 304
+
+    MenuService.create_item(tenant, MultiDict({'name': 'Waffles', 'category': 'Breakfast', 'price': '8'}), {})
+    edited = client.get(f'/menu/{tenant.slug}', headers={'If-None-Match': etag})
+    assert edited.status_code == 200 and b'Waffles' in edited.data
+    assert edited.headers['ETag'] != etag
+
+
+def test_chat_shell_and_versioned_menu_json(client):
+    tenant = ClientManager.create_client("Chat Shell Cafe", "basic")
+    MenuService.create_item(tenant, MultiDict({'name': 'Latte', 'category': 'Drinks', 'price': '4'}), {})
+
+    shell = client.get(f'/chat/{tenant.public_id}?mode=embed')
+    assert shell.status_code == 200 and b'Latte' not in shell.data # Items are not inlined
+    menu_url = f'/api/menu/{tenant.public_id}?v={tenant.content_version}'
+    assert menu_url.encode() in shell.data
+    assert client.get(f'/chat/{tenant.public_id}?mode=embed',
+                      headers={'If-None-Match': shell.headers['ETag']}).status_code == 304
+
+    menu = client.get(menu_url)
+    assert [item['name'] for item in menu.get_json()['items']] == ['Latte']
+    assert 'immutable' in menu.headers['Cache-Control']
+    assert client.get(menu_url, headers={'If-None-Match': menu.headers['ETag']}).status_code == 304
+    # Unversioned (or stale) requests get the short page max-age
+    assert 'immutable' not in client.get(f'/api/menu/{tenant.public_id}').headers['Cache-Control']
+
+    MenuService.create_item(tenant, MultiDict({'name': 'Mocha', 'category': 'Drinks', 'price': '5'}), {})
+    shell = client.get(f'/chat/{tenant.public_id}?mode=embed')
+    assert f'/api/menu/{tenant.public_id}?v={tenant.content_version}'.encode() in shell.data
+    assert len(client.get(f'/api/menu/{tenant.public_id}?v={tenant.content_version}').get_json()['items']) == 2
+
+
+def test_prerender_writes_static_pages_and_skips_unchanged(client, tmp_path):
+    from app.services.prerender_service import PrerenderService
+
+    tenant = ClientManager.create_client("Static Bistro", "basic")
+    MenuService.create_item(tenant, MultiDict({'name': 'Ramen', 'category': 'Mains', 'price': '12'}), {})
+    other = ClientManager.create_client("Quiet Corner", "basic")
+
+    assert PrerenderService.run(str(tmp_path)) == (2, 0, 0)
+    menu = tmp_path / 'menu' / tenant.slug / 'index.html'
+    assert b'Ramen' in menu.read_bytes()
+    assert (tmp_path / 'menu' / tenant.slug / 'index.html.gz').exists()
+    assert (tmp_path / 'chat' / tenant.public_id / 'embed.html').exists()
+    assert (tmp_path / 'api' / 'config' / f'{tenant.public_id}.json').exists()
+
+    assert PrerenderService.run(str(tmp_path)) == (0, 2, 0)
+
+    MenuService.create_item(tenant, MultiDict({'name': 'Gyoza', 'category': 'Mains', 'price': '6'}), {})
+    other.status = 'inactive'
+    db.session.commit()
+    assert PrerenderService.run(str(tmp_path)) == (1, 0, 1)
+    assert b'Gyoza' in menu.read_bytes()
+    assert not (tmp_path / 'menu' / other.public_id).exists()
+
+
+def test_prerender_build_needs_a_public_base_url(app, runner, tmp_path):
+    tenant = ClientManager.create_client("Public Host Cafe", "basic")
+    tenant.knowledge_base.avatar_image = 'avatars/chef.png'
+    db.session.commit()
+
+    result = runner.invoke(args=['prerender', 'build', '--out', str(tmp_path)])
+    assert result.exit_code != 0 and 'PRERENDER_BASE_URL' in result.output
+    assert not (tmp_path / 'api').exists()
+
+    app.config['PRERENDER_BASE_URL'] = 'https://jesse.example'
+    assert runner.invoke(args=['prerender', 'build', '--out', str(tmp_path)]).exit_code == 0
+    config = (tmp_path / 'api' / 'config' / f'{tenant.public_id}.json').read_text()
+    assert 'https://jesse.example/static/uploads/avatars/chef.png' in config
@@ -0,0 +1,171 @@
+import os
+import pytest
+from sqlalchemy.exc import IntegrityError
+from alembic.config import Config as AlembicConfig
+from alembic.script import ScriptDirectory
+from app import create_app, db
+from app.schema import SCHEMA_VERSION, sync_schema
+from config import Config
+
+
+def test_schema_version_tracks_alembic_head():
+    config = AlembicConfig()
+    config.set_main_option('script_location', os.path.join(os.path.dirname(__file__), '..', 'migrations'))
+    assert ScriptDirectory.from_config(config).get_current_head() == SCHEMA_VERSION
+
+
+def test_startup_skips_introspection_when_version_matches(tmp_path, monkeypatch):
+    class FileConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'cold.db'}"
+
+    first = create_app(FileConfig)
+    assert first.extensions['startup']['schema'] == 'synced'
+    assert "Schema current" in first.test_cli_runner().invoke(args=['schema', 'status']).output
+
+    # Next cold start on the same DB: one version lookup, no create_all
+    monkeypatch.setattr(db, 'create_all', lambda *a, **kw: (_ for _ in ()).throw(AssertionError("introspected")))
+    second = create_app(FileConfig)
+    assert second.extensions['startup']['schema'] == 'current'
+    assert set(second.extensions['startup']['timings']) >= {'import', 'extensions', 'schema', 'blueprints', 'total'}
+
+    with second.app_context():
+        db.session.execute(db.text("UPDATE schema_version SET version = 'old'"))
+        db.session.commit()
+    result = second.test_cli_runner().invoke(args=['schema', 'status'])
+    assert "run `flask schema sync`" in result.output
+
+
+def test_sync_adds_content_hash_to_upload_assets_from_before_dedup(tmp_path):
+    class FileConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'legacy.db'}"
+        SCHEMA_STARTUP_CHECK = 'skip'
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        db.create_all()
+        # upload_assets as first deployed: per-asset target, no content hash
+        db.session.execute(db.text("DROP TABLE upload_asset_refs"))
+        db.session.execute(db.text("DROP TABLE upload_assets"))
+        db.session.execute(db.text(
+            "CREATE TABLE upload_assets (id INTEGER PRIMARY KEY, status VARCHAR(20) NOT NULL, "
+            "staged_path VARCHAR(255) NOT NULL, folder VARCHAR(50) NOT NULL, public_id_prefix VARCHAR(100), "
+            "url VARCHAR(255), error TEXT, target_table VARCHAR(50), target_id INTEGER, "
+            "target_field VARCHAR(50), created_at DATETIME, completed_at DATETIME)"
+        ))
+        db.session.execute(db.text(
+            "INSERT INTO upload_assets (status, staged_path, folder, target_table, target_id, target_field) "
+            "VALUES ('pending', 'menu/old.jpg', 'menu', 'menu_items', 7, 'image_url')"
+        ))
+        db.session.commit()
+
+        assert sync_schema() == ['upload_assets.content_hash']
+
+        from app.models import UploadAsset, UploadAssetRef
+        ref = UploadAssetRef.query.one()
+        assert (ref.asset_id, ref.target_table, ref.target_id) == (1, 'menu_items', 7)
+        db.session.add(UploadAsset(content_hash='a' * 64, staged_path='menu/a.jpg', folder='menu', status='pending'))
+        db.session.commit()
+        db.session.add(UploadAsset(content_hash='a' * 64, staged_path='menu/b.jpg', folder='menu', status='pending'))
+        with pytest.raises(IntegrityError):
+            db.session.commit() # The unique index exists
+        db.session.rollback()
+
+
+def test_sync_fills_a_newly_created_rollup_from_the_logs(tmp_path):
+    class FileConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'history.db'}"
+        SCHEMA_STARTUP_CHECK = 'skip'
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        from app.models import InteractionLog, InteractionDailyRollup
+        from app.services.client_manager import ClientManager
+        db.create_all()
+        tenant = ClientManager.create_client("History Diner", "basic")
+        db.session.add_all([
+            InteractionLog(client_id=tenant.id, interaction_type='ai_chat', user_query='hi'),
+            InteractionLog(client_id=tenant.id, interaction_type='ai_chat', user_query='vegan?'),
+        ])
+        db.session.execute(db.text("DROP TABLE interaction_daily_rollup")) # Deployed before the rollup
+        db.session.commit()
+
+        sync_schema()
+        assert db.session.query(db.func.sum(InteractionDailyRollup.count)).scalar() == 2
+
+        sync_schema() # Existing table: no second backfill
+        assert db.session.query(db.func.sum(InteractionDailyRollup.count)).scalar() == 2
+
+
+def test_sync_regroups_rollup_clicks_keyed_by_label(tmp_path):
+    class FileConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'labels.db'}"
+        SCHEMA_STARTUP_CHECK = 'skip'
+        LOG_DURABILITY = 'sync'
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        from app.models import InteractionDailyRollup
+        from app.services.analytics import AnalyticsService
+        from app.services.client_manager import ClientManager
+        from app.services.log_ingest import LogIngestService
+        db.create_all()
+        tenant = ClientManager.create_client("Label Grill", "basic")
+        for label in ('Menu', '🍽️ View Menu'):
+            LogIngestService.record(tenant.id, 'button_click', label)
+        # As written before clicks were keyed by event_key
+        db.session.execute(db.text("UPDATE interaction_daily_rollup SET event = 'view menu'"))
+        db.session.commit()
+
+        sync_schema()
+        assert [(r.event, r.count) for r in InteractionDailyRollup.query.all()] == [('menu', 2)]
+        assert AnalyticsService.get_events_breakdown(tenant.id)['Menu Clicks'] == 2
+
+
+def upgrade_with_logs(tmp_path, revision, empty_rollup_at=None):
+    """
+    A file DB migrated to just before the rollup, holding 2 AI chats and 2 clicks,
+    then to `revision` (emptying the rollup on the way at `empty_rollup_at`).
+    """
+    from flask_migrate import Migrate, upgrade
+
+    class FileConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'alembic.db'}"
+        SCHEMA_STARTUP_CHECK = 'skip'
+
+    app = create_app(FileConfig)
+    Migrate(app, db)
+    directory = os.path.join(os.path.dirname(__file__), '..', 'migrations')
+    with app.app_context():
+        upgrade(directory, revision='af53d97ce64a')
+        db.session.execute(db.text(
+            "INSERT INTO clients (id, public_id, restaurant_name) VALUES (1, 'mig-cafe', 'Migration Cafe')"
+        ))
+        for interaction_type, query in [('ai_chat', 'hi'), ('ai_chat', 'vegan?'),
+                                        ('button_click', 'Menu'), ('button_click', ' View Menu')]:
+            db.session.execute(db.text(
+                "INSERT INTO interaction_logs (client_id, interaction_type, user_query, timestamp) "
+                "VALUES (1, :type, :query, '2026-10-01 09:30:00')"
+            ), {'type': interaction_type, 'query': query})
+        db.session.commit()
+        if empty_rollup_at:
+            upgrade(directory, revision=empty_rollup_at)
+            db.session.execute(db.text("DELETE FROM interaction_daily_rollup"))
+            db.session.commit()
+        upgrade(directory, revision=revision)
+        rows = db.session.execute(db.text(
+            "SELECT interaction_type, event, count FROM interaction_daily_rollup ORDER BY interaction_type, event"
+        )).all()
+    return [tuple(row) for row in rows]
+
+
+def test_rollup_migration_loads_existing_history(tmp_path):
+    assert upgrade_with_logs(tmp_path, 'ce3e81acfc75') == [
+        ('ai_chat', '', 2), ('button_click', 'menu', 1), ('button_click', 'view menu', 1)
+    ]
+
+
+def test_event_key_migration_rebuilds_every_bucket(tmp_path):
+    # Also when the rollup was left empty (created before it loaded history)
+    assert upgrade_with_logs(tmp_path, 'd71f4c2a9e58', empty_rollup_at='9b6e3a5d1c07') == [
+        ('ai_chat', '', 2), ('button_click', 'menu', 2)
+    ]
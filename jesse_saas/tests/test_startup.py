@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_optional_integrations_are_not_imported_at_startup(tmp_path):
+    # Fresh interpreter: the test process itself may already have them loaded
+    probe = (
+        "import sys\n"
+        "from app import create_app\n"
+        "create_app()\n"
+        "print('loaded:' + ','.join(m for m in ('cloudinary', 'requests', 'qrcode', 'alembic') if m in sys.modules))\n"
+    )
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'startup.db'}")
+    result = subprocess.run([sys.executable, '-c', probe], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == 'loaded:'
+
+
+def test_db_commands_load_flask_migrate_on_demand(runner):
+    result = runner.invoke(args=['db', '--help'])
+    assert result.exit_code == 0 and 'upgrade' in result.output
+    assert 'migrate' in runner.app.extensions
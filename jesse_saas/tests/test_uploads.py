@@ -0,0 +1,219 @@
+import io
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage, MultiDict
+from app.extensions import db
+from app.models import MenuItem, UploadAsset
+from app.services.client_manager import ClientManager
+from app.services.menu_service import MenuService
+from app.services.upload_service import UploadService
+from app.services.upload_pipeline import UploadPipeline
+from app.services.image_service import ImageService
+
+
+class RecordingBackend:
+    """Stand-in storage backend: records pushes and returns CDN-style URLs."""
+
+    def __init__(self):
+        self.pushed = []
+
+    def push(self, staged_path, folder, public_id_prefix):
+        self.pushed.append(staged_path)
+        return f"https://cdn.test/{staged_path}"
+
+
+@pytest.fixture
+def backend(app, tmp_path):
+    app.config.update({'UPLOAD_FOLDER': str(tmp_path), 'UPLOAD_MODE': 'async'})
+    backend = RecordingBackend()
+    UploadPipeline.set_backend(backend)
+    yield backend
+    UploadPipeline.set_backend(None)
+
+
+def image_file(name='dish.jpg'):
+    return FileStorage(io.BytesIO(b'\xff\xd8\xff fake jpeg'), filename=name)
+
+
+def test_local_srcset_lists_existing_variants(app, tmp_path):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    (tmp_path / 'menu').mkdir()
+    for name in ('dish.jpg', 'dish.w640.webp', 'dish.w320.webp', 'dish.w320.avif'):
+        (tmp_path / 'menu' / name).write_bytes(b'x')
+
+    with app.test_request_context():
+        assert UploadService.resolve_srcset('menu/dish.jpg', 'webp') == \
+            '/uploads/menu/dish.w320.webp 320w, /uploads/menu/dish.w640.webp 640w'
+        assert UploadService.resolve_srcset('menu/dish.jpg', 'avif') == '/uploads/menu/dish.w320.avif 320w'
+        assert UploadService.resolve_srcset('menu/dish.jpg') == '' # The original is the plain src
+
+
+def test_cloudinary_srcset_uses_width_transforms(app):
+    url = 'https://res.cloudinary.com/demo/image/upload/v1/menu/dish.jpg'
+    with app.test_request_context():
+        srcset = UploadService.resolve_srcset(url)
+        assert '/upload/f_auto,q_auto,w_320,c_limit/' in srcset and srcset.endswith(' 1024w')
+        assert UploadService.resolve_srcset(url, 'webp') == ''
+
+
+def test_upload_writes_variants_without_upscaling(app, tmp_path):
+    app.config.update({'UPLOAD_FOLDER': str(tmp_path), 'CLOUDINARY_CLOUD_NAME': None})
+    buffer = io.BytesIO()
+    Image.new('RGB', (800, 600), 'red').save(buffer, 'JPEG')
+    buffer.seek(0)
+
+    path = UploadService.upload(FileStorage(buffer, filename='dish.jpg'), folder='menu')
+
+    for fmt in ('avif', 'webp'): # The default formats
+        assert [width for width, _ in ImageService.variants(path, fmt)] == [320, 640, 800]
+
+
+def test_upload_is_staged_then_patched_by_worker(backend, tmp_path):
+    tenant = ClientManager.create_client("Async Kitchen", "basic")
+    version = tenant.content_version
+    item = MenuService.create_item(tenant, MultiDict({'name': 'Dumplings', 'price': '9'}), {'image': image_file()})
+    # In-memory SQLite shares one connection across threads: let the worker finish first
+    UploadPipeline.drain()
+    db.session.expire_all()
+
+    asset = UploadAsset.query.one()
+    assert asset.status == 'done' and backend.pushed == [asset.staged_path]
+    assert (tmp_path / asset.staged_path).exists() # Staged before the request returned
+    assert item.image_url == f"https://cdn.test/{asset.staged_path}"
+    assert tenant.content_version > version + 1 # Cached pages pick up the new URL
+
+
+def test_worker_leaves_a_replaced_field_alone(backend):
+    tenant = ClientManager.create_client("Changed Mind Cafe", "basic")
+    item = MenuService.create_item(tenant, MultiDict({'name': 'Tea', 'price': '2'}), {})
+
+    UploadPipeline.submit(image_file(), item, 'image_url', folder='menu')
+    db.session.info.pop('upload_assets') # Keep it pending instead of queueing
+    item.image_url = None
+    db.session.commit()
+
+    assert UploadPipeline.process_pending() == 1
+    db.session.expire_all()
+    assert UploadAsset.query.one().status == 'done'
+    assert db.session.get(MenuItem, item.id).image_url is None
+
+
+def test_worker_patches_a_field_on_the_clients_table(backend):
+    tenant = ClientManager.create_client("Own Field Cafe", "basic")
+    version = tenant.content_version
+    UploadPipeline.submit(image_file('logo.jpg'), tenant, 'website_url', folder='logos')
+    db.session.commit()
+    UploadPipeline.drain()
+    db.session.expire_all()
+
+    asset = UploadAsset.query.one()
+    assert tenant.website_url == asset.url == f"https://cdn.test/{asset.staged_path}"
+    assert tenant.content_version > version # The client owns itself
+
+
+def test_identical_bytes_share_one_asset_and_one_push(backend, tmp_path):
+    first = ClientManager.create_client("Twin One", "basic")
+    second = ClientManager.create_client("Twin Two", "basic")
+    a = MenuService.create_item(first, MultiDict({'name': 'Soup', 'price': '5'}), {})
+    b = MenuService.create_item(second, MultiDict({'name': 'Soup', 'price': '5'}), {})
+
+    UploadPipeline.submit(image_file('soup.jpg'), a, 'image_url', folder='menu')
+    UploadPipeline.submit(image_file('copy.JPG'), b, 'image_url', folder='menu')
+    db.session.commit()
+    UploadPipeline.drain()
+    db.session.expire_all()
+
+    asset = UploadAsset.query.one()
+    assert len(backend.pushed) == 1 and asset.refs.count() == 2
+    assert a.image_url == b.image_url == asset.url
+
+    # Already pushed: the field gets the URL in the request, nothing is queued or written
+    c = MenuService.create_item(first, MultiDict({'name': 'Soup 2', 'price': '5'}), {'image': image_file()})
+    UploadPipeline.drain()
+    assert c.image_url == asset.url and len(backend.pushed) == 1
+    assert not list((tmp_path / '.incoming').iterdir())
+
+
+def test_receive_sniffs_the_image_format(backend):
+    disguised = FileStorage(io.BytesIO(b'<?php echo 1; ?>'), filename='menu.jpg')
+    assert UploadService.receive(disguised) == (None, None, None)
+
+    png = FileStorage(io.BytesIO(b'\x89PNG\r\n\x1a\n' + b'0' * 100), filename='photo.jpg')
+    temp_path, content_hash, ext = UploadService.receive(png)
+    assert ext == 'png' and len(content_hash) == 64 # Stored by what it is, not what it is called
+
+
+def test_oversized_upload_is_rejected(app, backend, tmp_path):
+    app.config['UPLOAD_MAX_BYTES'] = 1000
+    tenant = ClientManager.create_client("Huge Photo Bar", "basic")
+    big = FileStorage(io.BytesIO(b'\xff\xd8\xff' + b'0' * 5000), filename='huge.jpg')
+
+    item = MenuService.create_item(tenant, MultiDict({'name': 'Nachos', 'price': '8'}), {'image': big})
+
+    assert item.image_url is None and UploadAsset.query.count() == 0
+    assert not list((tmp_path / '.incoming').iterdir())
+
+
+def test_request_over_max_content_length_gets_413(app, client):
+    app.config['MAX_CONTENT_LENGTH'] = 1000
+    with client.session_transaction() as sess:
+        sess['admin_logged_in'] = True
+    response = client.post('/admin/upload/bot-image', data={'image': (io.BytesIO(b'0' * 5000), 'big.jpg')})
+    assert response.status_code == 413
+
+
+def test_large_images_are_downscaled_before_storing(app, backend):
+    app.config['UPLOAD_MAX_DIMENSION'] = 500
+    buffer = io.BytesIO()
+    Image.new('RGB', (2000, 1000), 'blue').save(buffer, 'JPEG')
+    buffer.seek(0)
+
+    temp_path, _, ext = UploadService.receive(FileStorage(buffer, filename='wide.jpg'))
+
+    with Image.open(temp_path) as stored:
+        assert stored.size == (500, 250) and ext == 'jpg'
+
+
+def test_resolved_urls_are_memoized(app):
+    from app.services import upload_service
+    url = 'https://res.cloudinary.com/demo/image/upload/v1/menu/dish.jpg'
+    with app.test_request_context():
+        first = UploadService.resolve_url(url, width=640)
+        hits = upload_service._resolved.hits
+        assert UploadService.resolve_url(url, width=640) == first
+        assert upload_service._resolved.hits == hits + 1
+        assert first == 'https://res.cloudinary.com/demo/image/upload/f_auto,q_auto,w_640,c_limit/v1/menu/dish.jpg'
+        assert UploadService.resolve_url('menu/dish.jpg') == '/uploads/menu/dish.jpg'
+
+
+def test_menu_json_carries_resolved_image_urls(client):
+    tenant = ClientManager.create_client("Resolved Diner", "basic")
+    item = MenuService.create_item(tenant, MultiDict({'name': 'Pho', 'price': '11'}), {})
+    item.image_url = 'menu/pho.jpg'
+    db.session.commit()
+
+    data = client.get(f'/api/menu/{tenant.public_id}').get_json()
+    assert data['items'][0]['image_src'] == '/uploads/menu/pho.jpg'
+
+
+def test_uploads_route_offloads_to_nginx_with_immutable_caching(app, client, tmp_path):
+    app.config.update({'UPLOAD_FOLDER': str(tmp_path), 'UPLOAD_SERVE_MODE': 'x-accel'})
+    name = 'a' * 64 + '.jpg'
+    (tmp_path / 'menu').mkdir()
+    (tmp_path / 'menu' / name).write_bytes(b'jpeg bytes')
+    (tmp_path / 'menu' / 'mutable.jpg').write_bytes(b'jpeg bytes')
+    (tmp_path / '.incoming').mkdir()
+    (tmp_path / '.incoming' / 'staged').write_bytes(b'jpeg bytes')
+
+    response = client.get(f'/uploads/menu/{name}')
+    assert response.headers['X-Accel-Redirect'] == f'/_protected_uploads/menu/{name}'
+    assert response.data == b'' and response.mimetype == 'image/jpeg'
+    assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert 'immutable' not in client.get('/uploads/menu/mutable.jpg').headers.get('Cache-Control', '')
+
+    assert client.get('/uploads/.incoming/staged').status_code == 404
+    assert client.get('/uploads/../config.py').status_code == 404
+    assert client.get('/uploads/menu/missing.jpg').status_code == 404
+
+    app.config['UPLOAD_SERVE_MODE'] = 'app'
+    assert client.get(f'/uploads/menu/{name}').data == b'jpeg bytes'